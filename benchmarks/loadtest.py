@@ -0,0 +1,361 @@
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import random
+import sys
+import time
+import uuid
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import httpx
+
+SERVICE_TYPES = ['Construction', 'Delivery', 'Manufacture']
+BULK_SIZE = 50
+
+# operation -> relative weight; operation names double as report keys
+PROFILES = {
+      'read-only': {
+            'GET /tenders': 30,
+            'GET /tenders?service_type': 10,
+            'GET /tenders?after': 10,
+            'GET /tenders/my': 10,
+            'GET /tenders/{tenderId}/status': 10,
+            'GET /bids/my': 10,
+            'GET /bids/{tenderId}/list': 10,
+            'GET /bids/{bidId}/status': 10,
+      },
+      'read-heavy': {
+            'GET /tenders': 25,
+            'GET /tenders?service_type': 10,
+            'GET /tenders?after': 10,
+            'GET /tenders/my': 10,
+            'GET /tenders/{tenderId}/status': 10,
+            'GET /bids/my': 10,
+            'GET /bids/{tenderId}/list': 10,
+            'GET /bids/{bidId}/status': 5,
+            'POST /tenders/new': 2,
+            'PATCH /tenders/{tenderId}/edit': 2,
+            'POST /bids/new': 3,
+            'PATCH /bids/{bidId}/edit': 1,
+            'PUT /bids/{bidId}/submit_decision': 1,
+            'PUT /bids/{bidId}/feedback': 1,
+      },
+      'balanced': {
+            'GET /tenders': 15,
+            'GET /tenders?after': 5,
+            'GET /tenders/my': 5,
+            'GET /tenders/{tenderId}/status': 10,
+            'GET /bids/my': 5,
+            'GET /bids/{tenderId}/list': 5,
+            'GET /bids/{bidId}/status': 5,
+            'POST /tenders/new': 10,
+            'PATCH /tenders/{tenderId}/edit': 10,
+            'POST /bids/new': 15,
+            'PATCH /bids/{bidId}/edit': 5,
+            'PUT /bids/{bidId}/submit_decision': 5,
+            'PUT /bids/{bidId}/feedback': 5,
+      },
+      'write-heavy': {
+            'POST /tenders/bulk': 2,
+            'POST /bids/bulk': 3,
+            'GET /tenders': 5,
+            'GET /tenders/{tenderId}/status': 5,
+            'GET /bids/{tenderId}/list': 5,
+            'POST /tenders/new': 20,
+            'PATCH /tenders/{tenderId}/edit': 20,
+            'POST /bids/new': 25,
+            'PATCH /bids/{bidId}/edit': 10,
+            'PUT /bids/{bidId}/submit_decision': 5,
+            'PUT /bids/{bidId}/feedback': 5,
+      },
+}
+
+@dataclass
+class Fixtures:
+      username: str
+      user_id: str
+      organization_id: str
+      tender_ids: List[str]
+      bid_ids: List[str]
+      cursors: List[str] = field(default_factory=list)
+
+@dataclass
+class Stats:
+      latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+      statuses: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+
+      def record(self, operation: str, elapsed: float, status: str):
+            self.latencies[operation].append(elapsed)
+            self.statuses[operation][status] += 1
+
+def outcome(status: str) -> str:
+      # 4xx are reported apart from failures: with working fixtures every one of them is unexpected too
+      if not status.isdigit() or int(status) >= 500:
+            return 'errors'
+      if int(status) >= 400:
+            return 'client_errors'
+      return 'ok'
+
+def percentile(values: List[float], q: float) -> float:
+      ordered = sorted(values)
+      index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+      return ordered[index]
+
+def unique_name(prefix: str) -> str:
+      return f'{prefix} {uuid.uuid4().hex[:12]}'
+
+def build_request(operation: str, fixtures: Fixtures, rng: random.Random) -> dict:
+      tender_id = rng.choice(fixtures.tender_ids)
+      bid_id = rng.choice(fixtures.bid_ids)
+      username = fixtures.username
+
+      if operation == 'GET /tenders':
+            return {'method': 'GET', 'url': '/tenders', 'params': {'limit': 5, 'offset': rng.randint(0, 50)}}
+      if operation == 'GET /tenders?service_type':
+            return {'method': 'GET', 'url': '/tenders', 'params': {'limit': 5, 'service_type': rng.sample(SERVICE_TYPES, rng.randint(1, 2))}}
+      if operation == 'GET /tenders?after':
+            params = {'limit': 5}
+            if fixtures.cursors:
+                  params['after'] = rng.choice(fixtures.cursors)
+            return {'method': 'GET', 'url': '/tenders', 'params': params}
+      if operation == 'GET /tenders/my':
+            return {'method': 'GET', 'url': '/tenders/my', 'params': {'username': username, 'limit': 5}}
+      if operation == 'GET /tenders/{tenderId}/status':
+            return {'method': 'GET', 'url': f'/tenders/{tender_id}/status', 'params': {'username': username}}
+      if operation == 'GET /bids/my':
+            return {'method': 'GET', 'url': '/bids/my', 'params': {'username': username, 'paginationLimit': 5}}
+      if operation == 'GET /bids/{tenderId}/list':
+            return {'method': 'GET', 'url': f'/bids/{tender_id}/list', 'params': {'username': username, 'paginationLimit': 5}}
+      if operation == 'GET /bids/{bidId}/status':
+            return {'method': 'GET', 'url': f'/bids/{bid_id}/status', 'params': {'username': username}}
+      if operation == 'POST /tenders/new':
+            return {'method': 'POST', 'url': '/tenders/new', 'json': {
+                  'name': unique_name('Тендер'),
+                  'description': 'Нагрузочный тест',
+                  'serviceType': rng.choice(SERVICE_TYPES),
+                  'status': 'Created',
+                  'organizationId': fixtures.organization_id,
+                  'creatorUsername': username
+            }}
+      if operation == 'POST /tenders/bulk':
+            return {'method': 'POST', 'url': '/tenders/bulk', 'json': [{
+                  'name': unique_name('Тендер'),
+                  'description': 'Нагрузочный тест',
+                  'serviceType': rng.choice(SERVICE_TYPES),
+                  'status': 'Created',
+                  'organizationId': fixtures.organization_id,
+                  'creatorUsername': username
+            } for _ in range(BULK_SIZE)]}
+      if operation == 'PATCH /tenders/{tenderId}/edit':
+            return {'method': 'PATCH', 'url': f'/tenders/{tender_id}/edit', 'params': {'username': username}, 'json': {
+                  'name': unique_name('Тендер'),
+                  'description': 'Нагрузочный тест',
+                  'serviceType': rng.choice(SERVICE_TYPES)
+            }}
+      if operation == 'POST /bids/new':
+            return {'method': 'POST', 'url': '/bids/new', 'json': {
+                  'name': unique_name('Предложение'),
+                  'description': 'Нагрузочный тест',
+                  'tenderId': tender_id,
+                  'authorType': 'User',
+                  'authorId': fixtures.user_id
+            }}
+      if operation == 'POST /bids/bulk':
+            return {'method': 'POST', 'url': '/bids/bulk', 'json': [{
+                  'name': unique_name('Предложение'),
+                  'description': 'Нагрузочный тест',
+                  'tenderId': rng.choice(fixtures.tender_ids),
+                  'authorType': 'User',
+                  'authorId': fixtures.user_id
+            } for _ in range(BULK_SIZE)]}
+      if operation == 'PATCH /bids/{bidId}/edit':
+            return {'method': 'PATCH', 'url': f'/bids/{bid_id}/edit', 'params': {'username': username}, 'json': {
+                  'name': unique_name('Предложение'),
+                  'description': 'Нагрузочный тест'
+            }}
+      if operation == 'PUT /bids/{bidId}/submit_decision':
+            return {'method': 'PUT', 'url': f'/bids/{bid_id}/submit_decision', 'params': {'username': username, 'bidDecision': rng.choice(['Approved', 'Rejected'])}}
+      if operation == 'PUT /bids/{bidId}/feedback':
+            return {'method': 'PUT', 'url': f'/bids/{bid_id}/feedback', 'params': {'username': username, 'bidFeedback': 'Нагрузочный тест'}}
+      raise ValueError(f'Unknown operation: {operation}')
+
+async def worker(client: httpx.AsyncClient, fixtures: Fixtures, weights: Dict[str, int], deadline: float, stats: Stats, seed: int):
+      rng = random.Random(seed)
+      operations = list(weights)
+      counts = list(weights.values())
+      while time.perf_counter() < deadline:
+            operation = rng.choices(operations, counts)[0]
+            request = build_request(operation, fixtures, rng)
+            start = time.perf_counter()
+            try:
+                  response = await client.request(**request)
+                  status = str(response.status_code)
+                  cursor = response.headers.get('X-Next-Cursor')
+                  if cursor and len(fixtures.cursors) < 1000:
+                        fixtures.cursors.append(cursor)
+            except httpx.HTTPError as e:
+                  status = type(e).__name__
+            stats.record(operation, time.perf_counter() - start, status)
+
+async def run_level(base_url: str, fixtures: Fixtures, weights: Dict[str, int], concurrency: int, duration: float, warmup: float, timeout: float) -> dict:
+      limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+      async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+            if warmup > 0:
+                  deadline = time.perf_counter() + warmup
+                  await asyncio.gather(*(worker(client, fixtures, weights, deadline, Stats(), i) for i in range(concurrency)))
+
+            stats = Stats()
+            start = time.perf_counter()
+            deadline = start + duration
+            await asyncio.gather(*(worker(client, fixtures, weights, deadline, stats, 1000 + i) for i in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+      endpoints = {}
+      total = 0
+      outcomes = defaultdict(int)
+      for operation, latencies in sorted(stats.latencies.items()):
+            statuses = dict(stats.statuses[operation])
+            counts = defaultdict(int)
+            for status, count in statuses.items():
+                  counts[outcome(status)] += count
+            total += len(latencies)
+            for name, count in counts.items():
+                  outcomes[name] += count
+            endpoints[operation] = {
+                  'requests': len(latencies),
+                  'client_errors': counts['client_errors'],
+                  'errors': counts['errors'],
+                  'throughput_rps': round(len(latencies) / elapsed, 2),
+                  'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                  'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+                  'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+                  'max_ms': round(max(latencies) * 1000, 3),
+                  'statuses': statuses
+            }
+
+      return {
+            'concurrency': concurrency,
+            'duration_s': round(elapsed, 3),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'client_errors': outcomes['client_errors'],
+            'errors': outcomes['errors'],
+            'unexpected_ratio': round((outcomes['client_errors'] + outcomes['errors']) / total, 4) if total else 0,
+            'endpoints': endpoints
+      }
+
+async def bootstrap(dsn: str, tenders: int) -> Fixtures:
+      import asyncpg
+
+      username = 'loadtest_user'
+      conn = await asyncpg.connect(dsn)
+      try:
+            async with conn.transaction():
+                  user_id = await conn.fetchval(
+                        'INSERT INTO employee (id, username, first_name, last_name) VALUES ($1, $2, $3, $4) '
+                        'ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username RETURNING id',
+                        uuid.uuid4(), username, 'Load', 'Test')
+                  organization_id = await conn.fetchval(
+                        "SELECT organization_id FROM organization_responsible WHERE user_id = $1 LIMIT 1", user_id)
+                  if organization_id is None:
+                        organization_id = await conn.fetchval(
+                              "INSERT INTO organization (id, name, description, type) VALUES ($1, $2, $3, 'LLC') RETURNING id",
+                              uuid.uuid4(), 'Load test organization', 'Нагрузочный тест')
+                        await conn.execute(
+                              'INSERT INTO organization_responsible (id, organization_id, user_id) VALUES ($1, $2, $3)',
+                              uuid.uuid4(), organization_id, user_id)
+
+                  # enum columns are created from the Python enums, so the stored labels are member names
+                  tender_ids = [r['id'] for r in await conn.fetch('SELECT id FROM tenders WHERE "creatorUsername" = $1 LIMIT $2', username, tenders)]
+                  for _ in range(tenders - len(tender_ids)):
+                        tender_ids.append(await conn.fetchval(
+                              'INSERT INTO tenders (id, name, description, "serviceType", status, version, "organizationId", "creatorUsername") '
+                              'VALUES ($1, $2, $3, $4, $5, 1, $6, $7) RETURNING id',
+                              uuid.uuid4(), unique_name('Тендер'), 'Нагрузочный тест', random.choice(['CONSTRUCTION', 'DELIVERY', 'MANUFACTURE']),
+                              'CREATED', organization_id, username))
+
+                  bid_ids = [r['id'] for r in await conn.fetch('SELECT id FROM bids WHERE "authorId" = $1 LIMIT $2', user_id, tenders)]
+                  for tender_id in tender_ids[len(bid_ids):]:
+                        bid_ids.append(await conn.fetchval(
+                              'INSERT INTO bids (id, name, description, status, "tenderId", "authorType", "authorId", version) '
+                              "VALUES ($1, $2, $3, 'CREATED', $4, 'USER', $5, 1) RETURNING id",
+                              uuid.uuid4(), unique_name('Предложение'), 'Нагрузочный тест', tender_id, user_id))
+      finally:
+            await conn.close()
+
+      return Fixtures(username, str(user_id), str(organization_id), [str(i) for i in tender_ids], [str(i) for i in bid_ids])
+
+async def discover(base_url: str, username: str, user_id: str, organization_id: str, timeout: float) -> Fixtures:
+      async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+            tenders = await client.get('/tenders', params={'limit': 50})
+            bids = await client.get('/bids/my', params={'username': username, 'paginationLimit': 50})
+      tender_ids = [t['id'] for t in tenders.json()] if tenders.status_code == 200 else []
+      bid_ids = [b['id'] for b in bids.json()] if bids.status_code == 200 else []
+      if not tender_ids or not bid_ids:
+            raise SystemExit('No tenders or bids visible for this user; seed the database or pass --dsn to bootstrap fixtures')
+      return Fixtures(username, user_id, organization_id, tender_ids, bid_ids)
+
+async def amain(args) -> dict:
+      if args.dsn:
+            fixtures = await bootstrap(args.dsn, args.fixture_tenders)
+      else:
+            if not (args.username and args.user_id and args.organization_id):
+                  raise SystemExit('Pass --dsn, or --username, --user-id and --organization-id of an existing employee')
+            fixtures = await discover(args.base_url, args.username, args.user_id, args.organization_id, args.timeout)
+
+      weights = PROFILES[args.profile]
+      levels = []
+      for concurrency in args.concurrency:
+            levels.append(await run_level(args.base_url, fixtures, weights, concurrency, args.duration, args.warmup, args.timeout))
+            level = levels[-1]
+            print(f'concurrency={concurrency}: {level["throughput_rps"]} rps, '
+                  f'{level["client_errors"]} 4xx, {level["errors"]} errors', file=sys.stderr)
+
+      return {
+            'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'base_url': args.base_url,
+            'profile': args.profile,
+            'weights': weights,
+            'levels': levels
+      }
+
+def main():
+      parser = argparse.ArgumentParser(description='HTTP load generator for the tender and bid endpoints.')
+      parser.add_argument('--base-url', default='http://localhost:8080/api')
+      parser.add_argument('--profile', choices=sorted(PROFILES), default='read-heavy')
+      parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+      parser.add_argument('--duration', type=float, default=30, help='seconds measured per concurrency level')
+      parser.add_argument('--warmup', type=float, default=5, help='seconds of unmeasured load before each level')
+      parser.add_argument('--timeout', type=float, default=10)
+      parser.add_argument('--dsn', help='postgresql:// DSN used to create the load-test employee, organization, tenders and bids')
+      parser.add_argument('--fixture-tenders', type=int, default=20)
+      parser.add_argument('--username')
+      parser.add_argument('--user-id')
+      parser.add_argument('--organization-id')
+      parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+      parser.add_argument('--max-unexpected', type=float, default=0.01,
+                          help='fail the run when the share of 4xx, 5xx and transport errors at any level exceeds this fraction')
+      args = parser.parse_args()
+
+      report = asyncio.run(amain(args))
+      body = json.dumps(report, indent=2, ensure_ascii=False)
+      if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                  f.write(body)
+      else:
+            print(body)
+
+      failed = [level for level in report['levels'] if level['unexpected_ratio'] > args.max_unexpected]
+      for level in failed:
+            print(f'concurrency={level["concurrency"]}: {level["unexpected_ratio"]:.2%} unexpected responses '
+                  f'(limit {args.max_unexpected:.2%})', file=sys.stderr)
+      if failed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+      main()
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import base64
+import glob
+import json
+import math
+import sys
+import time
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+def percentile(values: List[float], q: float) -> float:
+      ordered = sorted(values)
+      return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+def profile(latencies: List[float]) -> Dict[str, Any]:
+      return {
+            'count': len(latencies),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3)
+      }
+
+def load_captures(patterns: List[str], methods: Optional[List[str]], limit: Optional[int]) -> List[Dict[str, Any]]:
+      records = []
+      for pattern in patterns:
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                  with open(path, encoding='utf-8') as f:
+                        for line in f:
+                              if line.strip():
+                                    records.append(json.loads(line))
+      records.sort(key=lambda r: r['ts'])
+      if methods:
+            records = [r for r in records if r['method'] in methods]
+      return records[:limit] if limit else records
+
+def key(record: Dict[str, Any]) -> str:
+      return f"{record['method']} {record.get('route') or record['path']}"
+
+def build_request(record: Dict[str, Any]) -> Dict[str, Any]:
+      request = {'method': record['method'], 'url': record['path']}
+      if record.get('query'):
+            request['url'] += '?' + record['query']
+      if 'body' in record:
+            request['content'] = record['body'].encode('utf-8')
+      elif 'body_base64' in record:
+            request['content'] = base64.b64decode(record['body_base64'])
+      if record.get('content_type'):
+            request['headers'] = {'content-type': record['content_type']}
+      return request
+
+class Replay:
+      def __init__(self):
+            self.latencies: Dict[str, List[float]] = defaultdict(list)
+            self.mismatches: Dict[str, int] = defaultdict(int)
+            self.errors: Dict[str, int] = defaultdict(int)
+            self.lag: List[float] = []
+
+      async def send(self, client: httpx.AsyncClient, record: Dict[str, Any]):
+            start = time.perf_counter()
+            try:
+                  response = await client.request(**build_request(record))
+            except httpx.HTTPError as e:
+                  self.errors[type(e).__name__] += 1
+                  return
+            self.latencies[key(record)].append((time.perf_counter() - start) * 1000)
+            if response.status_code != record['status']:
+                  self.mismatches[key(record)] += 1
+
+async def replay_timed(client: httpx.AsyncClient, records: List[Dict[str, Any]], speed: float, state: Replay):
+      first = records[0]['ts']
+      start = time.perf_counter()
+      tasks = []
+      for record in records:
+            # open loop: requests leave on the captured schedule whether or not earlier ones finished
+            target = start + (record['ts'] - first) / speed
+            delay = target - time.perf_counter()
+            if delay > 0:
+                  await asyncio.sleep(delay)
+            state.lag.append(max(0.0, time.perf_counter() - target) * 1000)
+            tasks.append(asyncio.ensure_future(state.send(client, record)))
+      await asyncio.gather(*tasks)
+
+async def replay_max(client: httpx.AsyncClient, records: List[Dict[str, Any]], concurrency: int, state: Replay):
+      queue = asyncio.Queue()
+      for record in records:
+            queue.put_nowait(record)
+
+      async def worker():
+            while not queue.empty():
+                  await state.send(client, queue.get_nowait())
+
+      await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def amain(args) -> Dict[str, Any]:
+      records = load_captures(args.captures, args.methods, args.limit)
+      skipped = sum(1 for r in records if r.get('body_truncated'))
+      records = [r for r in records if not r.get('body_truncated')]
+      if not records:
+            raise SystemExit('No replayable requests in the capture')
+
+      state = Replay()
+      limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+      started = time.perf_counter()
+      async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+            if args.speed == 'max':
+                  await replay_max(client, records, args.concurrency, state)
+            else:
+                  await replay_timed(client, records, float(args.speed), state)
+      elapsed = time.perf_counter() - started
+
+      captured = defaultdict(list)
+      for record in records:
+            captured[key(record)].append(record['duration_ms'])
+
+      endpoints = {}
+      for name in sorted(captured):
+            entry = {'captured': profile(captured[name])}
+            if state.latencies[name]:
+                  entry['replayed'] = profile(state.latencies[name])
+                  entry['ratio'] = {
+                        q: round(entry['replayed'][q] / entry['captured'][q], 2) if entry['captured'][q] else None
+                        for q in ('p50_ms', 'p95_ms', 'p99_ms')
+                  }
+            entry['status_mismatches'] = state.mismatches[name]
+            endpoints[name] = entry
+
+      span = records[-1]['ts'] - records[0]['ts']
+      return {
+            'requests': len(records),
+            'skipped_truncated': skipped,
+            'speed': args.speed,
+            'captured_span_s': round(span, 3),
+            'replay_duration_s': round(elapsed, 3),
+            'throughput_rps': round(len(records) / elapsed, 2),
+            'schedule_lag_p99_ms': round(percentile(state.lag, 99), 3) if state.lag else None,
+            'transport_errors': dict(state.errors),
+            # captured latency is measured inside the server, replayed latency at the client
+            'endpoints': endpoints
+      }
+
+def main():
+      parser = argparse.ArgumentParser(description='Replay captured requests and compare latency profiles with the capture.')
+      parser.add_argument('captures', nargs='+', help='capture files or globs, e.g. "captures/requests-*.jsonl"')
+      parser.add_argument('--base-url', default='http://localhost:8080/api')
+      parser.add_argument('--speed', default='1', help='time compression factor (1, 2, 10, ...) or "max"')
+      parser.add_argument('--concurrency', type=int, default=64, help='connection limit, and worker count for --speed max')
+      parser.add_argument('--methods', nargs='+', help='replay only these methods, e.g. GET')
+      parser.add_argument('--limit', type=int)
+      parser.add_argument('--timeout', type=float, default=10)
+      parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+      args = parser.parse_args()
+
+      if args.speed != 'max':
+            try:
+                  if float(args.speed) <= 0:
+                        raise ValueError
+            except ValueError:
+                  parser.error('--speed must be a positive number or "max"')
+
+      report = asyncio.run(amain(args))
+      body = json.dumps(report, indent=2, ensure_ascii=False)
+      if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                  f.write(body)
+      else:
+            print(body)
+
+if __name__ == '__main__':
+      main()
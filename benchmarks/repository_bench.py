@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache.identity import identity_cache
+from cache.versions import status_cache
+from repositories import queries
+from repositories.Bid import BidRepository
+from repositories.cursor import decode_cursor, encode_cursor
+from repositories.Tender import TenderRepository
+from schemas.db.config_db import engine, new_session
+
+DEFAULT_PLANS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plans.json')
+
+INDEX_NODES = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+SORT_NODES = ('Sort', 'Incremental Sort')
+
+@dataclass
+class Case:
+      name: str
+      call: Callable[[AsyncSession], Awaitable[Any]]
+      write: bool = False
+      uncached: bool = False
+
+def percentile(values: List[float], q: float) -> float:
+      ordered = sorted(values)
+      return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+def row_count(result: Any) -> int:
+      if isinstance(result, list):
+            return len(result)
+      return 1 if result else 0
+
+async def sample(session: AsyncSession) -> Dict[str, Any]:
+      # a mid-table tender and the most contended one, plus a user who authored bids on it
+      middle = (await session.execute(text(
+            'SELECT id, name, "creatorUsername" FROM tenders ORDER BY name, id '
+            'OFFSET (SELECT count(*) / 2 FROM tenders) LIMIT 1'))).first()
+      hot = (await session.execute(text(
+            'SELECT "tenderId" FROM bids GROUP BY "tenderId" ORDER BY count(*) DESC LIMIT 1'))).scalar()
+      author = (await session.execute(text(
+            'SELECT employee.id, employee.username FROM bids JOIN employee ON employee.id = bids."authorId" '
+            'WHERE bids."tenderId" = :id LIMIT 1'), {'id': hot})).first()
+      bid = (await session.execute(text(
+            'SELECT id, name FROM bids WHERE "authorId" = :author ORDER BY name, id '
+            'OFFSET (SELECT count(*) / 2 FROM bids WHERE "authorId" = :author) LIMIT 1'), {'author': author.id})).first()
+      if middle is None or hot is None or author is None or bid is None:
+            raise SystemExit('The database has too little data; run benchmarks/seed.py first')
+
+      return {
+            'tender_id': middle.id,
+            'tender_cursor': encode_cursor(middle.name, middle.id),
+            'creator': middle.creatorUsername,
+            'hot_tender_id': hot,
+            'author_id': author.id,
+            'author': author.username,
+            'bid_id': bid.id,
+            'bid_cursor': encode_cursor(bid.name, bid.id)
+      }
+
+async def first_batch(batches: AsyncIterator[List[Any]]) -> List[Any]:
+      try:
+            async for rows in batches:
+                  return rows
+            return []
+      finally:
+            await batches.aclose()
+
+async def check_filters(session: AsyncSession) -> List[str]:
+      # filters bind stored enum names; binding the API labels instead matches nothing and fails silently
+      present = (await session.execute(text(
+            'SELECT EXISTS (SELECT 1 FROM tenders WHERE "serviceType" = \'DELIVERY\')'))).scalar()
+      if not present:
+            return []
+
+      failures = []
+      listed = await TenderRepository.get_all_tenders(session, limit=50, offset=0, service_type=['Delivery'])
+      exported = await first_batch(TenderRepository.stream_tenders(['Delivery']))
+      for method, rows in (('get_all_tenders', listed), ('stream_tenders', exported)):
+            if not rows:
+                  failures.append(f'TenderRepository.{method}[service_type] returned no rows')
+            elif any(row.serviceType != 'DELIVERY' for row in rows):
+                  failures.append(f'TenderRepository.{method}[service_type] returned rows of other service types')
+      return failures
+
+def cases(f: Dict[str, Any]) -> List[Case]:
+      def name(prefix: str) -> str:
+            return f'{prefix} {uuid.uuid4().hex[:12]}'
+
+      return [
+            Case('TenderRepository.get_all_tenders', lambda s: TenderRepository.get_all_tenders(s, limit=50, offset=0, service_type=None)),
+            Case('TenderRepository.get_all_tenders[offset=10000]', lambda s: TenderRepository.get_all_tenders(s, limit=50, offset=10000, service_type=None)),
+            Case('TenderRepository.get_all_tenders[service_type]', lambda s: TenderRepository.get_all_tenders(s, limit=50, offset=0, service_type=['Delivery'])),
+            Case('TenderRepository.get_all_tenders[after]', lambda s: TenderRepository.get_all_tenders(s, limit=50, offset=0, service_type=None, after=f['tender_cursor'])),
+            Case('TenderRepository.get_all_tenders[after, service_type]', lambda s: TenderRepository.get_all_tenders(s, limit=50, offset=0, service_type=['Delivery'], after=f['tender_cursor'])),
+            Case('TenderRepository.stream_tenders[first batch]', lambda s: first_batch(TenderRepository.stream_tenders(None))),
+            Case('TenderRepository.stream_tenders[first batch, service_type]', lambda s: first_batch(TenderRepository.stream_tenders(['Delivery']))),
+            Case('TenderRepository.get_tender_status', lambda s: TenderRepository.get_tender_status(s, f['tender_id']), uncached=True),
+            Case('TenderRepository.get_user_tenders', lambda s: TenderRepository.get_user_tenders(s, f['creator'], limit=50, offset=0)),
+            Case('TenderRepository.user_exists', lambda s: TenderRepository.user_exists(s, f['creator']), uncached=True),
+            Case('TenderRepository.create_tender', lambda s: TenderRepository.create_tender(s, {
+                  'name': name('Тендер'), 'description': 'Бенчмарк', 'serviceType': 'Delivery',
+                  'organizationId': uuid.uuid4(), 'creatorUsername': f['creator']}), write=True),
+            Case('TenderRepository.edit_tender', lambda s: TenderRepository.edit_tender(s, f['tender_id'], {
+                  'name': name('Тендер'), 'description': 'Бенчмарк', 'serviceType': 'Delivery'}), write=True),
+            Case('BidRepository.get_user_bids', lambda s: BidRepository.get_user_bids(s, f['author'], limit=50, offset=0)),
+            Case('BidRepository.get_user_bids[after]', lambda s: BidRepository.get_user_bids(s, f['author'], limit=50, offset=0, after=f['bid_cursor'])),
+            Case('BidRepository.get_bids_for_tender[hot]', lambda s: BidRepository.get_bids_for_tender(s, f['hot_tender_id'], limit=50, offset=0)),
+            Case('BidRepository.get_bids_for_tender[hot, offset=1000]', lambda s: BidRepository.get_bids_for_tender(s, f['hot_tender_id'], limit=50, offset=1000)),
+            Case('BidRepository.get_bid_status', lambda s: BidRepository.get_bid_status(s, f['bid_id']), uncached=True),
+            Case('BidRepository.user_exists_by_id', lambda s: BidRepository.user_exists_by_id(s, str(f['author_id'])), uncached=True),
+            Case('BidRepository.create_bid', lambda s: BidRepository.create_bid(s, {
+                  'name': name('Предложение'), 'description': 'Бенчмарк', 'tenderId': f['hot_tender_id'],
+                  'authorType': 'User', 'authorId': f['author_id']}), write=True),
+            Case('BidRepository.edit_bid', lambda s: BidRepository.edit_bid(s, f['bid_id'], {'name': name('Предложение'), 'description': 'Бенчмарк'}), write=True),
+            Case('BidRepository.submit_decision', lambda s: BidRepository.submit_decision(s, f['bid_id'], 'Approved'), write=True),
+            Case('BidRepository.submit_bid_feedback', lambda s: BidRepository.submit_bid_feedback(s, f['bid_id'], name('reviewer'), 'Бенчмарк'), write=True),
+      ]
+
+async def measure(case: Case, iterations: int, warmup: int) -> Dict[str, Any]:
+      latencies = []
+      rows = 0
+      errors = []
+      for i in range(warmup + iterations):
+            if case.uncached:
+                  identity_cache.clear()
+                  status_cache.clear()
+            async with new_session() as session:
+                  start = time.perf_counter()
+                  try:
+                        result = await case.call(session)
+                  except ValueError as e:
+                        result = None
+                        errors.append(str(e))
+                  elapsed = time.perf_counter() - start
+                  # writes are measured inside a transaction that is never committed
+                  await session.rollback()
+            if i >= warmup:
+                  latencies.append(elapsed)
+                  rows += row_count(result)
+
+      total = sum(latencies)
+      return {
+            'write': case.write,
+            'iterations': iterations,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'max_ms': round(max(latencies) * 1000, 3),
+            'rows_per_second': round(rows / total, 1) if total else 0.0,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None
+      }
+
+def plan_params(f: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+      tender_name, tender_after = decode_cursor(f['tender_cursor'])
+      bid_name, bid_after = decode_cursor(f['bid_cursor'])
+      types = ['DELIVERY']
+      return {
+            'tenders.create': {'id': uuid.uuid4(), 'name': 'plan', 'description': '', 'serviceType': 'DELIVERY', 'status': 'CREATED', 'organizationId': uuid.uuid4(), 'creatorUsername': f['creator']},
+            'tenders.create_many': {'ids': [uuid.uuid4()], 'names': ['plan'], 'descriptions': [''], 'serviceTypes': ['DELIVERY'], 'statuses': ['CREATED'], 'organizationIds': [uuid.uuid4()], 'creatorUsernames': [f['creator']]},
+            'tenders.ids': {'ids': [f['tender_id'], f['hot_tender_id']]},
+            'tenders.list': {'limit': 50, 'offset': 0},
+            'tenders.list_by_type': {'types': types, 'limit': 50, 'offset': 0},
+            'tenders.list_after': {'after_name': tender_name, 'after_id': tender_after, 'limit': 50},
+            'tenders.list_after_by_type': {'after_name': tender_name, 'after_id': tender_after, 'types': types, 'limit': 50},
+            'tenders.export': {},
+            'tenders.export_by_type': {'types': types},
+            'tenders.export_after': {'after_name': tender_name, 'after_id': tender_after},
+            'tenders.export_after_by_type': {'after_name': tender_name, 'after_id': tender_after, 'types': types},
+            'tenders.status': {'id': f['tender_id']},
+            'tenders.user_list': {'username': f['creator'], 'limit': 50, 'offset': 0},
+            'tenders.edit': {'id': f['tender_id'], 'name': 'plan', 'description': '', 'serviceType': 'DELIVERY'},
+            'bids.create': {'id': uuid.uuid4(), 'name': 'plan', 'description': '', 'status': 'CREATED', 'tenderId': f['hot_tender_id'], 'authorType': 'USER', 'authorId': f['author_id']},
+            'bids.create_many': {'ids': [uuid.uuid4()], 'names': ['plan'], 'descriptions': [''], 'statuses': ['CREATED'], 'tenderIds': [f['hot_tender_id']], 'authorTypes': ['USER'], 'authorIds': [f['author_id']]},
+            'bids.user_list': {'username': f['author'], 'limit': 50, 'offset': 0},
+            'bids.user_list_after': {'username': f['author'], 'after_name': bid_name, 'after_id': bid_after, 'limit': 50},
+            'bids.tender_list': {'id': f['hot_tender_id'], 'limit': 50, 'offset': 0},
+            'bids.tender_list_after': {'id': f['hot_tender_id'], 'after_name': bid_name, 'after_id': bid_after, 'limit': 50},
+            'bids.tender_export': {'id': f['hot_tender_id']},
+            'bids.tender_export_after': {'id': f['hot_tender_id'], 'after_name': bid_name, 'after_id': bid_after},
+            'bids.edit': {'id': f['bid_id'], 'name': 'plan', 'description': ''},
+            'bids.decision': {'id': f['bid_id'], 'decision': 'Approved'},
+            'bids.status': {'id': f['bid_id']},
+            'bids.feedback': {'reviewId': uuid.uuid4(), 'username': 'plan', 'description': '', 'bidId': f['bid_id']},
+            'employee.id': {'username': f['author']},
+            'employee.username': {'id': f['author_id']},
+            'employee.ids': {'names': [f['author'], f['creator']]},
+            'employee.usernames': {'ids': [f['author_id']]},
+            'organization.ids': {'ids': [uuid.uuid4()]},
+      }
+
+def plan_shape(node: Dict[str, Any], depth: int = 0) -> List[Dict[str, Any]]:
+      shape = [{
+            'depth': depth,
+            'node': node['Node Type'],
+            'relation': node.get('Relation Name'),
+            'index': node.get('Index Name')
+      }]
+      for child in node.get('Plans', []):
+            shape.extend(plan_shape(child, depth + 1))
+      return shape
+
+async def capture_plans(f: Dict[str, Any]) -> Dict[str, Any]:
+      params = plan_params(f)
+      plans = {}
+      async with new_session() as session:
+            for name, statement in sorted(queries.STATEMENTS.items()):
+                  if name not in params:
+                        print(f'no plan parameters for {name}, skipped', file=sys.stderr)
+                        continue
+                  # plain EXPLAIN never executes the statement, so writes are safe to plan
+                  explain = text(f'EXPLAIN (FORMAT JSON) {statement.text.rstrip().rstrip(";")}')
+                  plan = (await session.execute(explain, params[name])).scalar()
+                  if isinstance(plan, str):
+                        plan = json.loads(plan)
+                  plans[name] = plan_shape(plan[0]['Plan'])
+            await session.rollback()
+      return plans
+
+def compare_plans(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, List[str]]:
+      report = {'regressions': [], 'changes': [], 'new': []}
+      for name, shape in sorted(current.items()):
+            if name not in baseline:
+                  report['new'].append(name)
+                  continue
+
+            before = baseline[name]
+            if before == shape:
+                  continue
+
+            indexed_before = {n['relation'] for n in before if n['node'] in INDEX_NODES}
+            seq_before = {n['relation'] for n in before if n['node'] == 'Seq Scan'}
+            lost = {n['relation'] for n in shape if n['node'] == 'Seq Scan'} & (indexed_before - seq_before)
+            for relation in sorted(lost):
+                  report['regressions'].append(f'{name}: index access on {relation} became Seq Scan')
+
+            sorts_before = sum(1 for n in before if n['node'] in SORT_NODES)
+            sorts_now = sum(1 for n in shape if n['node'] in SORT_NODES)
+            if sorts_now > sorts_before:
+                  report['regressions'].append(f'{name}: {sorts_now - sorts_before} new sort node(s)')
+
+            if not lost and sorts_now <= sorts_before:
+                  report['changes'].append(name)
+      return report
+
+async def amain(args) -> int:
+      async with new_session() as session:
+            fixtures = await sample(session)
+            checks = await check_filters(session)
+
+      results = {}
+      if not args.plans_only:
+            for case in cases(fixtures):
+                  if args.only and args.only not in case.name:
+                        continue
+                  results[case.name] = await measure(case, args.iterations, args.warmup)
+                  print(f'{case.name}: p50 {results[case.name]["p50_ms"]} ms', file=sys.stderr)
+
+      plans = await capture_plans(fixtures)
+      await engine.dispose()
+
+      status = 1 if checks else 0
+      if args.update_plans or not os.path.exists(args.plans):
+            with open(args.plans, 'w', encoding='utf-8') as f:
+                  json.dump(plans, f, indent=2, ensure_ascii=False)
+            plan_report = {'regressions': [], 'changes': [], 'new': [], 'baseline': f'written to {args.plans}'}
+      else:
+            with open(args.plans, encoding='utf-8') as f:
+                  plan_report = compare_plans(json.load(f), plans)
+            if plan_report['regressions']:
+                  status = 1
+
+      body = json.dumps({'repositories': results, 'checks': checks, 'plans': plan_report}, indent=2, ensure_ascii=False)
+      if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                  f.write(body)
+      else:
+            print(body)
+      for failure in checks:
+            print(f'CHECK FAILED: {failure}', file=sys.stderr)
+      for regression in plan_report['regressions']:
+            print(f'PLAN REGRESSION: {regression}', file=sys.stderr)
+      return status
+
+def main():
+      parser = argparse.ArgumentParser(description='Repository latency benchmark with EXPLAIN plan-shape regression checks.')
+      parser.add_argument('--iterations', type=int, default=200)
+      parser.add_argument('--warmup', type=int, default=20)
+      parser.add_argument('--only', help='run only cases whose name contains this string')
+      parser.add_argument('--plans', default=DEFAULT_PLANS, help='plan-shape snapshot to compare against')
+      parser.add_argument('--update-plans', action='store_true', help='overwrite the snapshot with the current plans')
+      parser.add_argument('--plans-only', action='store_true', help='skip latency measurements')
+      parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+      args = parser.parse_args()
+
+      sys.exit(asyncio.run(amain(args)))
+
+if __name__ == '__main__':
+      main()
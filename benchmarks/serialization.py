@@ -0,0 +1,69 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from repositories.rows import TenderRow
+from routing.responses import FastJSONResponse
+from schemas.db.models import TenderORM
+
+def make_rows(count):
+      now = datetime.datetime.now()
+      return [TenderRow(
+            id=uuid.uuid4(),
+            name=f'Тендер {i}',
+            description='Нужно доставить оборудование для олимпиады по робототехнике ' * 5,
+            serviceType='Delivery',
+            status='Created',
+            version=1,
+            organizationId=uuid.uuid4(),
+            creatorUsername=f'user{i}',
+            created_at=now,
+            updated_at=now
+      ) for i in range(count)]
+
+def make_orm(rows):
+      return [TenderORM(
+            id=r.id,
+            name=r.name,
+            description=r.description,
+            serviceType=r.serviceType,
+            status=r.status,
+            organizationId=str(r.organizationId),
+            creatorUsername=r.creatorUsername,
+            created_at=r.created_at,
+            updated_at=r.updated_at
+      ) for r in rows]
+
+def main():
+      parser = argparse.ArgumentParser(description='Per-item cost of serializing a listing page.')
+      parser.add_argument('--items', type=int, default=50)
+      parser.add_argument('--number', type=int, default=2000)
+      args = parser.parse_args()
+
+      rows = make_rows(args.items)
+      orm = make_orm(rows)
+
+      cases = {
+            'jsonable_encoder(TenderORM) + json': lambda: JSONResponse(content=jsonable_encoder(orm)).body,
+            'jsonable_encoder(TenderRow) + json': lambda: JSONResponse(content=jsonable_encoder(rows)).body,
+            'orjson(TenderRow)': lambda: FastJSONResponse(content=rows).body
+      }
+
+      results = {}
+      for name, fn in cases.items():
+            seconds = min(timeit.repeat(fn, number=args.number, repeat=3))
+            results[name] = seconds / args.number / args.items * 1e6
+
+      print(json.dumps({'items': args.items, 'us_per_item': results}, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+      main()
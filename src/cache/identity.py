@@ -0,0 +1,129 @@
+import time
+import uuid
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+from sqlalchemy import event
+
+from config import IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL, IDENTITY_CACHE_NEGATIVE_TTL
+from schemas.db.models import EmployeeORM
+
+MISSING = object()
+
+class TTLCache:
+      def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self.negative_ttl = negative_ttl
+            self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+      def get(self, key: Hashable) -> Any:
+            entry = self._data.get(key)
+            if entry is None:
+                  return MISSING
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                  del self._data[key]
+                  return MISSING
+
+            self._data.move_to_end(key)
+            return value
+
+      def set(self, key: Hashable, value: Any):
+            if self.maxsize <= 0:
+                  return
+
+            ttl = self.negative_ttl if value is None else self.ttl
+            if ttl <= 0:
+                  self._data.pop(key, None)
+                  return
+
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                  self._data.popitem(last=False)
+
+      def pop(self, key: Hashable) -> Any:
+            entry = self._data.pop(key, None)
+            return MISSING if entry is None else entry[0]
+
+      def clear(self):
+            self._data.clear()
+
+      def __len__(self):
+            return len(self._data)
+
+def _id_key(id: Any) -> str:
+      try:
+            return str(uuid.UUID(str(id)))
+      except ValueError:
+            return str(id)
+
+class EmployeeIdentityCache:
+      def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+            self._by_username = TTLCache(maxsize, ttl, negative_ttl)
+            self._by_id = TTLCache(maxsize, ttl, negative_ttl)
+            self.hits = 0
+            self.misses = 0
+
+      def get_id(self, username: str) -> Any:
+            return self._count(self._by_username.get(username))
+
+      def get_username(self, id: Any) -> Any:
+            return self._count(self._by_id.get(_id_key(id)))
+
+      def put_id(self, username: str, id: Any):
+            self._by_username.set(username, id)
+            if id is not None:
+                  self._by_id.set(_id_key(id), username)
+
+      def put_username(self, id: Any, username: Any):
+            self._by_id.set(_id_key(id), username)
+            if username is not None:
+                  self._by_username.set(username, id)
+
+      def invalidate_username(self, username: str):
+            id = self._by_username.pop(username)
+            if id is not MISSING and id is not None:
+                  self._by_id.pop(_id_key(id))
+
+      def invalidate_id(self, id: Any):
+            username = self._by_id.pop(_id_key(id))
+            if username is not MISSING and username is not None:
+                  self._by_username.pop(username)
+
+      def clear(self):
+            self._by_username.clear()
+            self._by_id.clear()
+
+      def stats(self) -> Dict[str, int]:
+            return {
+                  'hits': self.hits,
+                  'misses': self.misses,
+                  'usernames': len(self._by_username),
+                  'ids': len(self._by_id)
+            }
+
+      def _count(self, value: Any) -> Any:
+            if value is MISSING:
+                  self.misses += 1
+            else:
+                  self.hits += 1
+            return value
+
+identity_cache = EmployeeIdentityCache(
+      maxsize=IDENTITY_CACHE_SIZE,
+      ttl=IDENTITY_CACHE_TTL,
+      negative_ttl=IDENTITY_CACHE_NEGATIVE_TTL
+)
+
+@event.listens_for(EmployeeORM, 'after_insert')
+@event.listens_for(EmployeeORM, 'after_update')
+@event.listens_for(EmployeeORM, 'after_delete')
+def _invalidate_employee(mapper, connection, target):
+      if target.username is not None:
+            identity_cache.invalidate_username(target.username)
+      if target.id is not None:
+            identity_cache.invalidate_id(target.id)
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+
+from abc import ABC, abstractmethod
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from config import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_STALE_TTL
+from metrics import observe_cache_lookup
+from schemas.db.models import ServiceTypeEnum
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+      __slots__ = ('value', 'tags', 'fresh_until', 'stale_until')
+
+      value: Any
+      tags: FrozenSet[str]
+      fresh_until: float
+      stale_until: float
+
+class CacheBackend(ABC):
+      # wall-clock expiry keeps entries meaningful for backends shared between processes
+      @abstractmethod
+      async def get(self, key: str) -> Optional[CacheEntry]:
+            ...
+
+      @abstractmethod
+      async def set(self, key: str, entry: CacheEntry):
+            ...
+
+      @abstractmethod
+      async def invalidate(self, tags: Iterable[str]):
+            # entries with any of the tags must be gone, not merely stale: the next reader waits for fresh data
+            ...
+
+      @abstractmethod
+      async def clear(self):
+            ...
+
+class MemoryBackend(CacheBackend):
+      def __init__(self, maxsize: int):
+            self.maxsize = maxsize
+            self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+            self._keys_by_tag: Dict[str, Set[str]] = {}
+
+      async def get(self, key: str) -> Optional[CacheEntry]:
+            entry = self._entries.get(key)
+            if entry is None:
+                  return None
+            if entry.stale_until <= time.time():
+                  self._remove(key)
+                  return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+      async def set(self, key: str, entry: CacheEntry):
+            if self.maxsize <= 0:
+                  return
+
+            self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                  self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                  self._remove(next(iter(self._entries)))
+
+      async def invalidate(self, tags: Iterable[str]):
+            for tag in tags:
+                  for key in list(self._keys_by_tag.get(tag, ())):
+                        self._remove(key)
+
+      async def clear(self):
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+      def _remove(self, key: str):
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                  return
+            for tag in entry.tags:
+                  keys = self._keys_by_tag.get(tag)
+                  if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                              del self._keys_by_tag[tag]
+
+      def __len__(self):
+            return len(self._entries)
+
+class ResponseCache:
+      def __init__(self, name: str, backend: CacheBackend, ttl: float, stale_ttl: float, enabled: bool = True):
+            self.name = name
+            self.backend = backend
+            self.ttl = ttl
+            self.stale_ttl = stale_ttl
+            self.enabled = enabled
+            self._loading: Dict[str, Tuple[asyncio.Future, FrozenSet[str]]] = {}
+
+      async def get_or_load(self, key: str, tags: Iterable[str], loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+            if not self.enabled:
+                  return await loader()
+
+            entry = await self.backend.get(key)
+            if entry is not None and entry.fresh_until > time.time():
+                  observe_cache_lookup(self.name, 'hit')
+                  return entry.value
+
+            load = self._load(key, frozenset(tags), loader, self.ttl if ttl is None else ttl)
+            if entry is not None:
+                  observe_cache_lookup(self.name, 'stale')
+                  return entry.value
+
+            observe_cache_lookup(self.name, 'miss')
+            return await asyncio.shield(load)
+
+      async def invalidate(self, tags: Iterable[str]):
+            if not self.enabled:
+                  return
+
+            # loads already running may have read the old rows: later readers start their own and the old ones are not stored
+            tags = frozenset(tags)
+            for key, (_, load_tags) in list(self._loading.items()):
+                  if load_tags & tags:
+                        del self._loading[key]
+            await self.backend.invalidate(tags)
+
+      async def clear(self):
+            self._loading.clear()
+            await self.backend.clear()
+
+      def _load(self, key: str, tags: FrozenSet[str], loader: Callable[[], Awaitable[Any]], ttl: float) -> asyncio.Future:
+            # one load per key: concurrent misses wait on it and stale readers do not start another
+            current = self._loading.get(key)
+            if current is not None:
+                  return current[0]
+
+            load = asyncio.ensure_future(self._fill(key, tags, loader, ttl))
+            self._loading[key] = (load, tags)
+            load.add_done_callback(lambda f: self._finish(key, f))
+            return load
+
+      def _finish(self, key: str, load: asyncio.Future):
+            if self._loading.get(key, (None,))[0] is load:
+                  del self._loading[key]
+            if not load.cancelled() and load.exception() is not None:
+                  logger.debug('Refreshing %s entry %s failed: %r', self.name, key, load.exception())
+
+      async def _fill(self, key: str, tags: FrozenSet[str], loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+            value = await loader()
+
+            current = self._loading.get(key)
+            if current is not None and current[0] is asyncio.current_task():
+                  now = time.time()
+                  await self.backend.set(key, CacheEntry(value, tags, now + ttl, now + ttl + self.stale_ttl))
+            return value
+
+def tender_list_tags(service_types: Optional[Iterable[str]]) -> FrozenSet[str]:
+      # service types arrive both as values ('Delivery') and as stored names ('DELIVERY')
+      if not service_types:
+            return frozenset(f'tenders:{t.name}' for t in ServiceTypeEnum)
+      return frozenset(f'tenders:{str(t).upper()}' for t in service_types)
+
+tender_list_cache = ResponseCache('tenders.list', MemoryBackend(RESPONSE_CACHE_SIZE), RESPONSE_CACHE_TTL, RESPONSE_CACHE_STALE_TTL, enabled=RESPONSE_CACHE_ENABLED)
@@ -0,0 +1,38 @@
+import uuid
+
+from typing import Any, Hashable
+
+from cache.identity import TTLCache, MISSING
+from config import STATUS_CACHE_SIZE, STATUS_CACHE_TTL
+
+def _key(kind: str, id: Any) -> Hashable:
+      try:
+            return (kind, uuid.UUID(str(id)))
+      except ValueError:
+            return (kind, str(id))
+
+class StatusCache:
+      def __init__(self, maxsize: int, ttl: float):
+            # misses are never cached: an unknown id has no validators to reuse
+            self._rows = TTLCache(maxsize, ttl, negative_ttl=0)
+            self.hits = 0
+            self.misses = 0
+
+      def get(self, kind: str, id: Any) -> Any:
+            row = self._rows.get(_key(kind, id))
+            if row is MISSING:
+                  self.misses += 1
+            else:
+                  self.hits += 1
+            return row
+
+      def put(self, kind: str, id: Any, row: Any):
+            self._rows.set(_key(kind, id), row)
+
+      def invalidate(self, kind: str, id: Any):
+            self._rows.pop(_key(kind, id))
+
+      def clear(self):
+            self._rows.clear()
+
+status_cache = StatusCache(STATUS_CACHE_SIZE, STATUS_CACHE_TTL)
@@ -0,0 +1,110 @@
+import base64
+import json
+import logging
+import os
+import queue
+import random
+import time
+
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Iterable, List
+
+logger = logging.getLogger('capture')
+logger.propagate = False
+
+# Starlette builds middleware itself, so the lifespan reaches the instances through here
+_instances: List['CaptureMiddleware'] = []
+
+def _body_field(body: bytes) -> dict:
+      try:
+            return {'body': body.decode('utf-8')}
+      except UnicodeDecodeError:
+            return {'body_base64': base64.b64encode(body).decode('ascii')}
+
+class CaptureMiddleware:
+      def __init__(self, app, path: str, sample_rate: float, max_body_bytes: int, max_bytes: int, backups: int, exclude: Iterable[str] = ()):
+            self.app = app
+            self.sample_rate = sample_rate
+            self.max_body_bytes = max_body_bytes
+            self.exclude = set(exclude)
+
+            path = path.format(pid=os.getpid())
+            directory = os.path.dirname(path)
+            if directory:
+                  os.makedirs(directory, exist_ok=True)
+
+            # the file is written from a listener thread so a slow disk never blocks the event loop
+            self.handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            self.handler.setFormatter(logging.Formatter('%(message)s'))
+            records = queue.SimpleQueue()
+            self.queue_handler = QueueHandler(records)
+            logger.addHandler(self.queue_handler)
+            logger.setLevel(logging.INFO)
+            self.listener = QueueListener(records, self.handler)
+            self.listener.start()
+            _instances.append(self)
+
+      def close(self):
+            # stop() drains the queue, so records logged before shutdown still reach the file
+            logger.removeHandler(self.queue_handler)
+            self.listener.stop()
+            self.handler.close()
+
+      async def __call__(self, scope, receive, send):
+            if scope['type'] != 'http' or random.random() >= self.sample_rate:
+                  await self.app(scope, receive, send)
+                  return
+
+            root_path = scope.get('root_path', '')
+            path = scope['path']
+            if root_path and path.startswith(root_path):
+                  path = path[len(root_path):]
+            if path in self.exclude:
+                  await self.app(scope, receive, send)
+                  return
+
+            body = bytearray()
+            truncated = False
+            status_code = 500
+
+            async def receive_wrapper():
+                  nonlocal truncated
+                  message = await receive()
+                  if message['type'] == 'http.request':
+                        chunk = message.get('body', b'')
+                        room = self.max_body_bytes - len(body)
+                        body.extend(chunk[:max(room, 0)])
+                        truncated = truncated or len(chunk) > room
+                  return message
+
+            async def send_wrapper(message):
+                  nonlocal status_code
+                  if message['type'] == 'http.response.start':
+                        status_code = message['status']
+                  await send(message)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            try:
+                  await self.app(scope, receive_wrapper, send_wrapper)
+            finally:
+                  headers = dict(scope.get('headers') or [])
+                  record = {
+                        'ts': started_at,
+                        'method': scope['method'],
+                        'path': path,
+                        'route': getattr(scope.get('route'), 'path', None),
+                        'query': scope.get('query_string', b'').decode('latin-1'),
+                        'content_type': headers.get(b'content-type', b'').decode('latin-1') or None,
+                        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                        'status': status_code
+                  }
+                  if body:
+                        record.update(_body_field(bytes(body)))
+                  if truncated:
+                        record['body_truncated'] = True
+                  logger.info(json.dumps(record, ensure_ascii=False))
+
+def close_capture():
+      while _instances:
+            _instances.pop().close()
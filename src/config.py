@@ -7,4 +7,61 @@ POSTGRES_HOST = os.getenv("POSTGRES_HOST")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT")
 POSTGRES_DATABASE = os.getenv("POSTGRES_DATABASE")
 POSTGRES_USERNAME = os.getenv("POSTGRES_USERNAME")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
\ No newline at end of file
+POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
+
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", 300))
+IDENTITY_CACHE_NEGATIVE_TTL = float(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL", 5))
+
+STATUS_CACHE_SIZE = int(os.getenv("STATUS_CACHE_SIZE", 10000))
+STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", 1))
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1000))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 5))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", 30))
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "false").lower() in ("1", "true", "yes")
+
+IDENTITY_BATCH_ENABLED = os.getenv("IDENTITY_BATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+IDENTITY_BATCH_DELAY = float(os.getenv("IDENTITY_BATCH_DELAY", 0.0002))
+IDENTITY_BATCH_MAX_SIZE = int(os.getenv("IDENTITY_BATCH_MAX_SIZE", 500))
+IDENTITY_POOL_SIZE = int(os.getenv("IDENTITY_POOL_SIZE", 2))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER_MODE", "false").lower() in ("1", "true", "yes")
+
+DB_READ_HOSTS = [h for h in os.getenv("DB_READ_HOSTS", "").split(",") if h]
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", DB_POOL_SIZE))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", DB_MAX_OVERFLOW))
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", 2))
+READ_YOUR_WRITES_SIZE = int(os.getenv("READ_YOUR_WRITES_SIZE", 10000))
+
+DB_WARMUP_CONNECTIONS = int(os.getenv("DB_WARMUP_CONNECTIONS", DB_POOL_SIZE))
+DB_WARMUP_STATEMENTS = os.getenv("DB_WARMUP_STATEMENTS", "true").lower() in ("1", "true", "yes")
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH", "logs/slow_queries-{pid}.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", 5))
+
+CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() in ("1", "true", "yes")
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", 0.01))
+CAPTURE_PATH = os.getenv("CAPTURE_PATH", "captures/requests-{pid}.jsonl")
+CAPTURE_MAX_BODY_BYTES = int(os.getenv("CAPTURE_MAX_BODY_BYTES", 64 * 1024))
+CAPTURE_MAX_BYTES = int(os.getenv("CAPTURE_MAX_BYTES", 50 * 1024 * 1024))
+CAPTURE_BACKUPS = int(os.getenv("CAPTURE_BACKUPS", 5))
+CAPTURE_EXCLUDE = [p for p in os.getenv("CAPTURE_EXCLUDE", "/ping,/ready,/pool,/metrics").split(",") if p]
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 1000))
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
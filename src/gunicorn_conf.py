@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "workers.UvicornWorker"
+worker_tmp_dir = "/dev/shm"
+
+backlog = int(os.getenv("BACKLOG", 2048))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+max_requests = int(os.getenv("MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 0))
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# DB_MAX_CONNECTIONS is the connection budget for the whole server,
+# workers inherit their share through the environment after fork;
+# each worker's identity lookup pool comes out of that share
+if os.getenv("DB_MAX_CONNECTIONS"):
+      identity_pool = int(os.getenv("IDENTITY_POOL_SIZE", 2))
+      os.environ["DB_POOL_SIZE"] = str(max(1, int(os.environ["DB_MAX_CONNECTIONS"]) // workers - identity_pool))
+      os.environ["DB_MAX_OVERFLOW"] = "0"
+
+# prometheus_client aggregates metrics of all workers through files in this directory
+if workers > 1:
+      os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+def on_starting(server):
+      path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+      if path:
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+      if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import multiprocess
+            multiprocess.mark_process_dead(worker.pid)
@@ -6,16 +6,41 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.schemas.db.init_db import create_tables
+from config import DEBUG, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_PGBOUNCER_MODE, DB_WARMUP_CONNECTIONS, DB_WARMUP_STATEMENTS
+from config import DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW, IDENTITY_BATCH_ENABLED, IDENTITY_POOL_SIZE
+from config import SLOW_QUERY_LOG_ENABLED, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_LOG_PATH, SLOW_QUERY_LOG_MAX_BYTES, SLOW_QUERY_LOG_BACKUPS
+from config import CAPTURE_ENABLED, CAPTURE_SAMPLE_RATE, CAPTURE_PATH, CAPTURE_MAX_BODY_BYTES, CAPTURE_MAX_BYTES, CAPTURE_BACKUPS, CAPTURE_EXCLUDE
+from capture import CaptureMiddleware, close_capture
+from metrics import MetricsMiddleware, instrument_engine
+from slow_queries import install_slow_query_log
+from schemas.db.config_db import ReadYourWritesMiddleware, engine, identity_engine, read_engines
+from schemas.db.init_db import migrate_schema
+from schemas.db.warmup import warm_up
+from repositories.queries import WARMUP
 from src.routing.common import common_router
 from src.routing.tenders import tenders_router
 from src.routing.bids import bids_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-      await create_tables()
-      print('INFO:     База данных создана')
+      app.state.ready = False
+      version = await migrate_schema()
+      print(f'INFO:     Версия схемы БД: {version}')
+
+      statements = WARMUP if DB_WARMUP_STATEMENTS and not DB_PGBOUNCER_MODE else ()
+      warmed = await warm_up(engine, min(DB_WARMUP_CONNECTIONS, DB_POOL_SIZE), statements)
+      print(f'INFO:     Прогрето соединений с БД: {warmed}')
+      for read_engine in read_engines:
+            warmed = await warm_up(read_engine, min(DB_WARMUP_CONNECTIONS, DB_READ_POOL_SIZE), statements)
+            print(f'INFO:     Прогрето соединений с репликой {read_engine.url.host}: {warmed}')
+      app.state.ready = True
       yield
+      app.state.ready = False
+      await engine.dispose()
+      await identity_engine.dispose()
+      for read_engine in read_engines:
+            await read_engine.dispose()
+      close_capture()
       print('INFO:     Выключение')
 
 app = FastAPI(
@@ -23,9 +48,23 @@ app = FastAPI(
       root_path="/api"
 )
 
+instrument_engine(engine, DB_POOL_SIZE + DB_MAX_OVERFLOW)
+if IDENTITY_BATCH_ENABLED:
+      instrument_engine(identity_engine, IDENTITY_POOL_SIZE)
+for read_engine in read_engines:
+      instrument_engine(read_engine, DB_READ_POOL_SIZE + DB_READ_MAX_OVERFLOW)
+if SLOW_QUERY_LOG_ENABLED:
+      for logged_engine in [engine, identity_engine, *read_engines]:
+            install_slow_query_log(logged_engine, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_LOG_PATH, SLOW_QUERY_LOG_MAX_BYTES, SLOW_QUERY_LOG_BACKUPS)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(MetricsMiddleware)
+if CAPTURE_ENABLED:
+      app.add_middleware(CaptureMiddleware, path=CAPTURE_PATH, sample_rate=CAPTURE_SAMPLE_RATE, max_body_bytes=CAPTURE_MAX_BODY_BYTES,
+                         max_bytes=CAPTURE_MAX_BYTES, backups=CAPTURE_BACKUPS, exclude=CAPTURE_EXCLUDE)
+
 app.include_router(router=common_router)
 app.include_router(router=tenders_router)
 app.include_router(router=bids_router)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="127.0.0.1", port=8080, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="127.0.0.1", port=8080, reload=DEBUG)
\ No newline at end of file
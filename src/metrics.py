@@ -0,0 +1,97 @@
+import os
+import time
+
+from typing import Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency by route', ['method', 'route'], buckets=LATENCY_BUCKETS)
+REQUEST_COUNT = Counter('http_requests_total', 'HTTP responses by route and status code', ['method', 'route', 'status'])
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'HTTP requests currently being served', multiprocess_mode='livesum')
+
+DB_QUERY_LATENCY = Histogram('db_query_duration_seconds', 'Database statement latency by registry name', ['statement'], buckets=LATENCY_BUCKETS)
+DB_POOL_CHECKOUT_WAIT = Histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection', buckets=LATENCY_BUCKETS)
+DB_POOL_CHECKED_OUT = Gauge('db_pool_connections_checked_out', 'Pooled connections currently in use', multiprocess_mode='livesum')
+DB_POOL_CAPACITY = Gauge('db_pool_connections_capacity', 'Pool size plus allowed overflow', multiprocess_mode='livesum')
+
+CACHE_LOOKUPS = Counter('response_cache_lookups_total', 'Response cache lookups by cache and result (hit, stale, miss)', ['cache', 'result'])
+SINGLE_FLIGHT_CALLS = Counter('single_flight_calls_total', 'Coalesced reads by statement and role (leader ran the query, shared awaited it)', ['statement', 'role'])
+
+class MetricsMiddleware:
+      def __init__(self, app):
+            self.app = app
+
+      async def __call__(self, scope, receive, send):
+            if scope['type'] != 'http':
+                  await self.app(scope, receive, send)
+                  return
+
+            status_code = 500
+
+            async def send_wrapper(message):
+                  nonlocal status_code
+                  if message['type'] == 'http.response.start':
+                        status_code = message['status']
+                  await send(message)
+
+            REQUESTS_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            try:
+                  await self.app(scope, receive, send_wrapper)
+            finally:
+                  elapsed = time.perf_counter() - start
+                  REQUESTS_IN_FLIGHT.dec()
+
+                  route = scope.get('route')
+                  path = getattr(route, 'path', '<unmatched>')
+                  REQUEST_LATENCY.labels(scope['method'], path).observe(elapsed)
+                  REQUEST_COUNT.labels(scope['method'], path, str(status_code)).inc()
+
+def instrument_engine(engine: AsyncEngine, capacity: int):
+      sync_engine = engine.sync_engine
+      DB_POOL_CAPACITY.inc(capacity)
+
+      @event.listens_for(sync_engine, 'before_cursor_execute')
+      def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+      @event.listens_for(sync_engine, 'after_cursor_execute')
+      def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['query_start'].pop()
+            name = context.execution_options.get('statement_name', 'other') if context is not None else 'other'
+            DB_QUERY_LATENCY.labels(name).observe(elapsed)
+
+      @event.listens_for(sync_engine, 'handle_error')
+      def _handle_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get('query_start'):
+                  conn.info['query_start'].pop()
+
+      @event.listens_for(sync_engine.pool, 'checkout')
+      def _checkout(dbapi_connection, connection_record, connection_proxy):
+            DB_POOL_CHECKED_OUT.inc()
+
+      @event.listens_for(sync_engine.pool, 'checkin')
+      def _checkin(dbapi_connection, connection_record):
+            DB_POOL_CHECKED_OUT.dec()
+
+def observe_checkout_wait(seconds: float):
+      DB_POOL_CHECKOUT_WAIT.observe(seconds)
+
+def observe_cache_lookup(cache: str, result: str):
+      CACHE_LOOKUPS.labels(cache, result).inc()
+
+def observe_single_flight(statement: str, role: str):
+      SINGLE_FLIGHT_CALLS.labels(statement, role).inc()
+
+def render_metrics() -> Tuple[bytes, str]:
+      if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+      else:
+            registry = REGISTRY
+      return generate_latest(registry), CONTENT_TYPE_LATEST
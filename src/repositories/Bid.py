@@ -1,39 +1,44 @@
 import uuid
 
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
-from schemas.db.config_db import new_session
-from schemas.db.models import BidORM
+from cache.identity import MISSING
+from cache.versions import status_cache
+from config import EXPORT_BATCH_SIZE
+from repositories import queries
+from repositories.cursor import decode_cursor
+from repositories.flight import flight_key, read_flight
+from repositories.rows import BidRow, StatusRow
+from repositories.Employee import EmployeeRepository
+from repositories.Organization import OrganizationRepository
+from schemas.db.config_db import after_commit, new_read_session
+from schemas.db.models import BidAuthorTypeEnum, BidDecisionEnum, StatusBidEnum
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.sql import text      
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def _fetch_bids(session: AsyncSession, query, params: Dict[str, Any]) -> List[BidRow]:
+      result = await session.execute(query, params)
+      return [BidRow(*row) for row in result]
+
+def _invalidate_status(session: AsyncSession, bidId: str):
+      async def invalidate():
+            status_cache.invalidate('bid', bidId)
+      after_commit(session, invalidate)
 
 class BidRepository:
       @staticmethod
-      async def create_bid(data: Dict[str, Any]):
+      async def create_bid(session: AsyncSession, data: Dict[str, Any]):
             try:
-                  async with new_session() as session:
-                        bid = BidORM(
-                              name=data['name'],
-                              description=data['description'],
-                              status='Created',
-                              tenderId=data['tenderId'],
-                              authorType=data['authorType'],
-                              authorId=data['authorId']
-                        )
-
-                        session.add(bid)
-                        await session.commit()
-                        await session.refresh(bid)
-
-                        return {
-                              "id": str(bid.id),
-                              "name": bid.name,
-                              "status": bid.status,
-                              "authorType": bid.authorType,
-                              "authorId": str(bid.authorId),
-                              "version": bid.version,
-                              "created_at": bid.created_at
-                        }
+                  result = await session.execute(queries.BID_CREATE, {
+                        'id': uuid.uuid4(),
+                        'name': data['name'],
+                        'description': data['description'],
+                        'status': StatusBidEnum.CREATED.name,
+                        'tenderId': data['tenderId'],
+                        'authorType': BidAuthorTypeEnum(data['authorType']).name,
+                        'authorId': data['authorId']
+                  })
+                  return BidRow(*result.first())
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
@@ -42,93 +47,155 @@ class BidRepository:
                   raise ValueError(f"Unexpected error: {str(e)}")
       
       @staticmethod
-      async def get_user_bids(username, limit, offset) -> List[BidORM]:
+      async def create_bids(session: AsyncSession, items: List[Dict[str, Any]]) -> List[Tuple[Optional[BidRow], Optional[str]]]:
+            results: List[Tuple[Optional[BidRow], Optional[str]]] = [(None, None)] * len(items)
+            pending = {}
+            names = set()
+            for index, item in enumerate(items):
+                  try:
+                        tender_id = uuid.UUID(str(item['tenderId']))
+                        author_id = uuid.UUID(str(item['authorId']))
+                  except ValueError:
+                        results[index] = (None, 'Invalid tenderId or authorId')
+                        continue
+                  try:
+                        author_type = BidAuthorTypeEnum(item['authorType'])
+                  except ValueError:
+                        results[index] = (None, 'Invalid authorType')
+                        continue
+                  if item['name'] in names:
+                        results[index] = (None, 'Duplicate name in request')
+                        continue
+
+                  names.add(item['name'])
+                  pending[index] = {
+                        'id': uuid.uuid4(),
+                        'name': item['name'],
+                        'description': item['description'],
+                        'tenderId': tender_id,
+                        'authorType': author_type,
+                        'authorId': author_id
+                  }
+
             try:
-                  async with new_session() as session:
-
-                        base_query = 'SELECT * FROM bids WHERE bids."authorId" = '
-                        base_query += '(SELECT id FROM employee WHERE employee.username = ' f"'{username}') "
-                        base_query += 'ORDER BY bids.name LIMIT :limit OFFSET :offset;'
-
-                        query = text(base_query)
-
-                        result = await session.execute(query, {'limit': limit, 'offset': offset})
-                        bids_list = [{
-                                    'id': i[0],
-                                    'name': i[1],
-                                    'status': i[3],
-                                    'authorType': i[4],
-                                    'authorId': i[5],
-                                    'version': i[6],
-                                    'created_at': i[9]
-                              } for i in result.fetchall()]
-                        return bids_list
+                  users = await EmployeeRepository.users_exist_by_id(session,
+                        [p['authorId'] for p in pending.values() if p['authorType'] is BidAuthorTypeEnum.USER])
+                  organizations = await OrganizationRepository.existing_ids(session,
+                        [p['authorId'] for p in pending.values() if p['authorType'] is BidAuthorTypeEnum.ORGANIZATION])
+                  result = await session.execute(queries.TENDER_IDS, {'ids': list({p['tenderId'] for p in pending.values()})})
+                  tenders = set(result.scalars())
+
+                  for index in list(pending):
+                        row = pending[index]
+                        if row['authorType'] is BidAuthorTypeEnum.USER and not users.get(row['authorId']):
+                              results[index] = (None, 'User with this id does not exist')
+                              del pending[index]
+                        elif row['authorType'] is BidAuthorTypeEnum.ORGANIZATION and row['authorId'] not in organizations:
+                              results[index] = (None, 'Organization not found')
+                              del pending[index]
+                        elif row['tenderId'] not in tenders:
+                              results[index] = (None, 'Tender not found')
+                              del pending[index]
+
+                  created = {}
+                  if pending:
+                        rows = list(pending.values())
+                        result = await session.execute(queries.BID_CREATE_MANY, {
+                              'ids': [r['id'] for r in rows],
+                              'names': [r['name'] for r in rows],
+                              'descriptions': [r['description'] for r in rows],
+                              'statuses': [StatusBidEnum.CREATED.name] * len(rows),
+                              'tenderIds': [r['tenderId'] for r in rows],
+                              'authorTypes': [r['authorType'].name for r in rows],
+                              'authorIds': [r['authorId'] for r in rows]
+                        })
+                        created = {row.name: BidRow(*row) for row in result}
+
+                  for index, row in pending.items():
+                        bid = created.get(row['name'])
+                        results[index] = (bid, None) if bid else (None, 'Bid with this name already exists')
+
+                  return results
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except KeyError as e:
+                  raise ValueError(f"Missing field: {str(e)}")
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
+
+      @staticmethod
+      async def get_user_bids(session: AsyncSession, username, limit, offset, after: Optional[str] = None) -> List[BidRow]:
+            try:
+                  params = {'username': username, 'limit': limit}
+
+                  if after:
+                        params['after_name'], params['after_id'] = decode_cursor(after)
+                        query = queries.BID_USER_LIST_AFTER
+                  else:
+                        params['offset'] = offset
+                        query = queries.BID_USER_LIST
+
+                  return await read_flight.do(flight_key(query, params, session.bind), lambda: _fetch_bids(session, query, params))
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
       
       @staticmethod
-      async def get_bids_for_tender(id, limit, offset):
+      async def get_bids_for_tender(session: AsyncSession, id, limit, offset, after: Optional[str] = None):
             try:
-                  async with new_session() as session:
-                        query = text('SELECT * FROM bids JOIN tenders ON tenders.id = bids."tenderId" WHERE tenders.id = :id ORDER BY bids.name LIMIT :limit OFFSET :offset;')
-                        result = await session.execute(query, {'id': id, 'limit': limit, 'offset': offset})
-                        bids_list = [{
-                              'id': i[0],
-                              'name': i[1],
-                              'status': i[3],
-                              'authorType': i[4],
-                              'authorId': i[5],
-                              'version': i[6],
-                              'created_at': i[9]
-                        } for i in result.fetchall()]
-                        return bids_list
+                  if after:
+                        after_name, after_id = decode_cursor(after)
+                        query, params = queries.BID_TENDER_LIST_AFTER, {'id': id, 'after_name': after_name, 'after_id': after_id, 'limit': limit}
+                  else:
+                        query, params = queries.BID_TENDER_LIST, {'id': id, 'limit': limit, 'offset': offset}
+                  return await read_flight.do(flight_key(query, params, session.bind), lambda: _fetch_bids(session, query, params))
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
 
       @staticmethod
-      async def edit_bid(bidId: int, data: Dict[str, Any]):
+      async def stream_bids_for_tender(id, after: Optional[str] = None) -> AsyncIterator[List[BidRow]]:
+            params = {'id': id}
+            if after:
+                  params['after_name'], params['after_id'] = decode_cursor(after)
+                  query = queries.BID_TENDER_EXPORT_AFTER
+            else:
+                  query = queries.BID_TENDER_EXPORT
+
             try:
-                  async with new_session() as session:
-                        query = text('UPDATE bids SET name = :name, description = :description, version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = :id;')
-                        await session.execute(query, {'id': bidId, 'name': data['name'], 'description': data['description']})
-                        await session.commit()
-                        
-                        query = text('SELECT * FROM bids WHERE id = :id;')
-                        result = await session.execute(query, {'id': bidId})
-                        bids_list = [{
-                              'id': i[0],
-                              'name': i[1],
-                              'status': i[3],
-                              'authorType': i[4],
-                              'authorId': i[5],
-                              'version': i[6],
-                              'created_at': i[9]
-                        } for i in result.fetchall()]
-
-                        return bids_list[0]
+                  # the export outlives the request-scoped session, so it holds its own
+                  async with new_read_session() as session:
+                        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE), params)
+                        async for partition in result.partitions():
+                              yield [BidRow(*row) for row in partition]
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
-            except KeyError as e:
-                  raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
-      
+
+      @staticmethod
+      async def tender_exists(session: AsyncSession, id: str) -> bool:
+            try:
+                  result = await session.execute(queries.TENDER_IDS, {'ids': [uuid.UUID(str(id))]})
+                  return result.scalar() is not None
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
+
       @staticmethod
-      async def submit_decision(id: str, decision: str):
+      async def edit_bid(session: AsyncSession, bidId: int, data: Dict[str, Any]):
             try:
-                  async with new_session() as session:
-                        query = text('UPDATE bids SET decision = :decision WHERE id = :id;')
+                  result = await session.execute(queries.BID_EDIT, {'id': bidId, 'name': data['name'], 'description': data['description']})
+                  row = result.first()
+                  if row is None:
+                        return None
 
-                        await session.execute(query, {'decision': decision, 'id': id})
-                        
-                        query = text('SELECT * FROM bids WHERE id = :id;')
-                        result = await session.execute(query, {'id': id})
+                  _invalidate_status(session, bidId)
 
-                        return result.fetchall()[0]
+                  return BidRow(*row)
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
@@ -137,35 +204,39 @@ class BidRepository:
                   raise ValueError(f"Unexpected error: {str(e)}")
       
       @staticmethod
-      async def get_bid_status(id: str):
+      async def submit_decision(session: AsyncSession, id: str, decision: str):
             try:
-                  async with new_session() as session:
-                        query = text('SELECT status FROM bids WHERE id = :id;')
+                  # decision is a varchar that keeps the API label, unlike the enum columns
+                  result = await session.execute(queries.BID_DECISION, {'decision': BidDecisionEnum(decision).value, 'id': id})
 
-                        result = await session.execute(query, {'id': id})
-                        status = result.scalar()
+                  row = result.first()
+                  if row is None:
+                        return None
 
-                        return status
+                  _invalidate_status(session, id)
+                  return BidRow(*row)
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
                   raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
-
+      
       @staticmethod
-      async def submit_bid_feedback(bidId: str, username: str, feedback: str):
-            try:
-                  async with new_session() as session:
-                        insert_query = text('INSERT INTO bids_reviews (id, "userName", description, "bidId") VALUES (:reviewId, :username, :description, :bidId);')
+      async def get_bid_status(session: AsyncSession, id: str) -> Optional[StatusRow]:
+            cached = status_cache.get('bid', id)
+            if cached is not MISSING:
+                  return cached
 
-                        await session.execute(insert_query, {'reviewId': uuid.uuid4(), 'bidId': bidId, 'username': username, 'description': feedback})
-                        await session.commit()
-                        
-                        select_query = text('SELECT * FROM bids WHERE id = :id;')
-                        result = await session.execute(select_query, {'id': bidId})
+            try:
+                  result = await session.execute(queries.BID_STATUS, {'id': id})
+                  row = result.first()
+                  if row is None:
+                        return None
 
-                        return result.fetchall()[0]
+                  status_row = StatusRow(*row)
+                  status_cache.put('bid', id, status_row)
+                  return status_row
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
@@ -174,29 +245,31 @@ class BidRepository:
                   raise ValueError(f"Unexpected error: {str(e)}")
 
       @staticmethod
-      async def user_exists(username: str):
+      async def submit_bid_feedback(session: AsyncSession, bidId: str, username: str, feedback: str):
             try:
-                  async with new_session() as session:
+                  result = await session.execute(queries.BID_FEEDBACK, {'reviewId': uuid.uuid4(), 'bidId': bidId, 'username': username, 'description': feedback})
 
-                        check_query = text('SELECT id FROM employee WHERE username = :username;')
-                        result = await session.execute(check_query, {'username': username})
-                        user_id = result.scalar()
-
-                        return user_id
+                  row = result.first()
+                  if row is None:
+                        return None
 
+                  _invalidate_status(session, bidId)
+                  return BidRow(*row)
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except KeyError as e:
+                  raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
-                  raise ValueError(f"Unexpected error: {str(e)}")    
+                  raise ValueError(f"Unexpected error: {str(e)}")
 
       @staticmethod
-      async def user_exists_by_id(id: str):
-            try:
-                  async with new_session() as session:
-
-                        check_query = text('SELECT username FROM employee WHERE id = :id;')
-                        result = await session.execute(check_query, {'id': id})
-                        username = result.scalar()
+      async def user_exists(session: AsyncSession, username: str):
+            return await EmployeeRepository.user_exists(session, username)
 
-                        return username
+      @staticmethod
+      async def user_exists_by_id(session: AsyncSession, id: str):
+            return await EmployeeRepository.user_exists_by_id(session, id)
 
-            except Exception as e:
-                  raise ValueError(f"Unexpected error: {str(e)}")    
\ No newline at end of file
+      @staticmethod
+      async def users_exist_by_id(session: AsyncSession, ids: List[uuid.UUID]):
+            return await EmployeeRepository.users_exist_by_id(session, ids)
@@ -0,0 +1,115 @@
+import uuid
+
+from typing import Any, Dict, List
+
+from cache.identity import identity_cache, MISSING
+from config import IDENTITY_BATCH_ENABLED, IDENTITY_BATCH_DELAY, IDENTITY_BATCH_MAX_SIZE
+from repositories import queries
+from repositories.loader import BatchLoader
+from schemas.db.config_db import new_identity_session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def _load_ids(usernames: List[str]) -> Dict[str, Any]:
+      async with new_identity_session() as session:
+            result = await session.execute(queries.EMPLOYEE_IDS, {'names': usernames})
+            return dict(result.fetchall())
+
+async def _load_usernames(ids: List[uuid.UUID]) -> Dict[uuid.UUID, Any]:
+      async with new_identity_session() as session:
+            result = await session.execute(queries.EMPLOYEE_USERNAMES, {'ids': ids})
+            return dict(result.fetchall())
+
+username_loader = BatchLoader(_load_ids, delay=IDENTITY_BATCH_DELAY, max_batch_size=IDENTITY_BATCH_MAX_SIZE)
+id_loader = BatchLoader(_load_usernames, delay=IDENTITY_BATCH_DELAY, max_batch_size=IDENTITY_BATCH_MAX_SIZE)
+
+class EmployeeRepository:
+      @staticmethod
+      async def user_exists(session: AsyncSession, username: str):
+            if not username:
+                  return None
+
+            user_id = identity_cache.get_id(username)
+            if user_id is not MISSING:
+                  return user_id
+
+            try:
+                  if IDENTITY_BATCH_ENABLED:
+                        user_id = await username_loader.load(username)
+                  else:
+                        result = await session.execute(queries.EMPLOYEE_ID, {'username': username})
+                        user_id = result.scalar()
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
+
+            identity_cache.put_id(username, user_id)
+            return user_id
+
+      @staticmethod
+      async def user_exists_by_id(session: AsyncSession, id: str):
+            if not id:
+                  return None
+
+            username = identity_cache.get_username(id)
+            if username is not MISSING:
+                  return username
+
+            try:
+                  employee_id = uuid.UUID(str(id))
+                  if IDENTITY_BATCH_ENABLED:
+                        username = await id_loader.load(employee_id)
+                  else:
+                        result = await session.execute(queries.EMPLOYEE_USERNAME, {'id': employee_id})
+                        username = result.scalar()
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
+
+            identity_cache.put_username(id, username)
+            return username
+
+      @staticmethod
+      async def users_exist(session: AsyncSession, usernames: List[str]) -> Dict[str, Any]:
+            found = {}
+            missing = []
+            for username in set(usernames):
+                  user_id = identity_cache.get_id(username)
+                  if user_id is MISSING:
+                        missing.append(username)
+                  else:
+                        found[username] = user_id
+
+            if missing:
+                  try:
+                        result = await session.execute(queries.EMPLOYEE_IDS, {'names': missing})
+                        loaded = dict(result.fetchall())
+                  except Exception as e:
+                        raise ValueError(f"Unexpected error: {str(e)}")
+
+                  for username in missing:
+                        found[username] = loaded.get(username)
+                        identity_cache.put_id(username, found[username])
+
+            return found
+
+      @staticmethod
+      async def users_exist_by_id(session: AsyncSession, ids: List[uuid.UUID]) -> Dict[uuid.UUID, Any]:
+            found = {}
+            missing = []
+            for employee_id in set(ids):
+                  username = identity_cache.get_username(employee_id)
+                  if username is MISSING:
+                        missing.append(employee_id)
+                  else:
+                        found[employee_id] = username
+
+            if missing:
+                  try:
+                        result = await session.execute(queries.EMPLOYEE_USERNAMES, {'ids': missing})
+                        loaded = dict(result.fetchall())
+                  except Exception as e:
+                        raise ValueError(f"Unexpected error: {str(e)}")
+
+                  for employee_id in missing:
+                        found[employee_id] = loaded.get(employee_id)
+                        identity_cache.put_username(employee_id, found[employee_id])
+
+            return found
@@ -0,0 +1,22 @@
+import uuid
+
+from typing import Iterable, Set
+
+from repositories import queries
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+class OrganizationRepository:
+      @staticmethod
+      async def existing_ids(session: AsyncSession, ids: Iterable[uuid.UUID]) -> Set[uuid.UUID]:
+            ids = list(set(ids))
+            if not ids:
+                  return set()
+
+            try:
+                  result = await session.execute(queries.ORGANIZATION_IDS, {'ids': ids})
+                  return set(result.scalars())
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
@@ -1,29 +1,56 @@
-from typing import List, Dict, Any
-
-from schemas.db.config_db import new_session
-from schemas.db.models import TenderORM
+import uuid
+
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple
+
+from cache.identity import MISSING
+from cache.response import tender_list_cache, tender_list_tags
+from cache.versions import status_cache
+from config import EXPORT_BATCH_SIZE
+from repositories import queries
+from repositories.cursor import decode_cursor
+from repositories.flight import flight_key, read_flight
+from repositories.rows import TenderRow, StatusRow
+from repositories.Employee import EmployeeRepository
+from repositories.Organization import OrganizationRepository
+from schemas.db.config_db import after_commit, new_read_session, remember_write
+from schemas.db.models import ServiceTypeEnum, StatusTenderEnum
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.sql import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def _fetch_tenders(session: AsyncSession, query, params: Dict[str, Any]) -> List[TenderRow]:
+      result = await session.execute(query, params)
+      return [TenderRow(*row) for row in result]
+
+# pages reloaded right after a tender write come from the primary, not from a replica that may lag behind it
+LISTING_WRITE_KEY = 'tenders:list'
+
+def _invalidate_listings(session: AsyncSession, service_types: Iterable[str]):
+      tags = tender_list_tags(list(service_types))
+      remember_write(LISTING_WRITE_KEY)
+      after_commit(session, lambda: tender_list_cache.invalidate(tags))
+
+def _invalidate_status(session: AsyncSession, tenderId: str):
+      # dropping the entry before commit would let a concurrent reader cache the old row again
+      async def invalidate():
+            status_cache.invalidate('tender', tenderId)
+      after_commit(session, invalidate)
 
 class TenderRepository:
       @staticmethod
-      async def create_tender(data: Dict[str, Any]):
+      async def create_tender(session: AsyncSession, data: Dict[str, Any]):
             try:
-                  async with new_session() as session:
-                        tender = TenderORM(
-                              name=data['name'],
-                              description=data['description'],
-                              serviceType=data['serviceType'],
-                              status='Created',
-                              version=1,
-                              organizationId=str(data['organizationId']),
-                              creatorUsername=data['creatorUsername']
-                        )
-
-                        session.add(tender)
-                        await session.commit()
-
-                        return tender.id
+                  result = await session.execute(queries.TENDER_CREATE, {
+                        'id': uuid.uuid4(),
+                        'name': data['name'],
+                        'description': data['description'],
+                        'serviceType': ServiceTypeEnum(data['serviceType']).name,
+                        'status': StatusTenderEnum.CREATED.name,
+                        'organizationId': str(data['organizationId']),
+                        'creatorUsername': data['creatorUsername']
+                  })
+                  _invalidate_listings(session, [ServiceTypeEnum(data['serviceType']).name])
+
+                  return result.scalar()
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
@@ -32,136 +59,173 @@ class TenderRepository:
                   raise ValueError(f"Unexpected error: {str(e)}")
       
       @staticmethod
-      async def get_all_tenders(limit, offset, service_type) -> List[TenderORM]:
+      async def create_tenders(session: AsyncSession, items: List[Dict[str, Any]]) -> List[Tuple[Optional[TenderRow], Optional[str]]]:
+            results: List[Tuple[Optional[TenderRow], Optional[str]]] = [(None, None)] * len(items)
+            pending = {}
+            names = set()
+            for index, item in enumerate(items):
+                  try:
+                        organization_id = uuid.UUID(str(item['organizationId']))
+                  except ValueError:
+                        results[index] = (None, 'Invalid organizationId')
+                        continue
+                  try:
+                        service_type = ServiceTypeEnum(item['serviceType']).name
+                  except ValueError:
+                        results[index] = (None, 'Invalid serviceType')
+                        continue
+                  if item['name'] in names:
+                        results[index] = (None, 'Duplicate name in request')
+                        continue
+
+                  names.add(item['name'])
+                  pending[index] = {
+                        'id': uuid.uuid4(),
+                        'name': item['name'],
+                        'description': item['description'],
+                        'serviceType': service_type,
+                        'organizationId': organization_id,
+                        'creatorUsername': item['creatorUsername']
+                  }
+
             try:
-                  async with new_session() as session:
-                        base_query = 'SELECT * FROM tenders '
-                        
-                        params = {
-                              'limit': limit,
-                              'offset': offset
-                        }
-
-                        service_type_sql = None
-                        if service_type and isinstance(service_type, list):
-                              service_type_sql = '('
-                              for i in range(len(service_type)):
-                                    if i != len(service_type) - 1:
-                                          service_type_sql += f"'{str(service_type[i])}', "
-                                    else:
-                                          service_type_sql += f"'{str(service_type[i])}')"
-                              base_query += f'WHERE "serviceType" IN {service_type_sql} '
-
-                        base_query += 'ORDER BY name LIMIT :limit OFFSET :offset;'
-                        
-                        query = text(base_query)
-
-                        result = await session.execute(query, params)
-                        
-                        tenders_list = [TenderORM(
-                              id = i[0],
-                              name = i[1],
-                              description = i[2],
-                              serviceType = i[3],
-                              status = i[4],
-                              organizationId = str(i[6]),
-                              creatorUsername = i[7],
-                              created_at = i[8],
-                              updated_at = i[9]
-                        ) for i in result.fetchall()]
-
-                        return tenders_list
+                  creators = await EmployeeRepository.users_exist(session, [p['creatorUsername'] for p in pending.values()])
+                  organizations = await OrganizationRepository.existing_ids(session, [p['organizationId'] for p in pending.values()])
+                  for index in list(pending):
+                        if not creators.get(pending[index]['creatorUsername']):
+                              results[index] = (None, 'User does not exist or invalid')
+                              del pending[index]
+                        elif pending[index]['organizationId'] not in organizations:
+                              results[index] = (None, 'Organization not found')
+                              del pending[index]
+
+                  created = {}
+                  if pending:
+                        rows = list(pending.values())
+                        result = await session.execute(queries.TENDER_CREATE_MANY, {
+                              'ids': [r['id'] for r in rows],
+                              'names': [r['name'] for r in rows],
+                              'descriptions': [r['description'] for r in rows],
+                              'serviceTypes': [r['serviceType'] for r in rows],
+                              'statuses': [StatusTenderEnum.CREATED.name] * len(rows),
+                              'organizationIds': [r['organizationId'] for r in rows],
+                              'creatorUsernames': [r['creatorUsername'] for r in rows]
+                        })
+                        created = {row.name: TenderRow(*row) for row in result}
+                        if created:
+                              _invalidate_listings(session, {t.serviceType for t in created.values()})
+
+                  for index, row in pending.items():
+                        tender = created.get(row['name'])
+                        results[index] = (tender, None) if tender else (None, 'Tender with this name already exists')
+
+                  return results
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
+            except KeyError as e:
+                  raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
 
       @staticmethod
-      async def get_tender_status(id: str):
+      async def get_all_tenders(session: AsyncSession, limit, offset, service_type, after: Optional[str] = None) -> List[TenderRow]:
             try:
-                  async with new_session() as session:
-                        query = text('SELECT status FROM tenders WHERE id = :id;')
+                  params = {
+                        'limit': limit
+                  }
 
-                        result = await session.execute(query, {'id': id})
-                        status = result.scalar()
+                  if service_type and isinstance(service_type, list):
+                        params['types'] = sorted({ServiceTypeEnum(t).name for t in service_type})
 
-                        return status
+                  if after:
+                        params['after_name'], params['after_id'] = decode_cursor(after)
+                        query = queries.TENDER_LIST_AFTER_BY_TYPE if 'types' in params else queries.TENDER_LIST_AFTER
+                  else:
+                        params['offset'] = offset
+                        query = queries.TENDER_LIST_BY_TYPE if 'types' in params else queries.TENDER_LIST
+
+                  return await read_flight.do(flight_key(query, params, session.bind), lambda: _fetch_tenders(session, query, params))
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
-            except KeyError as e:
-                  raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
 
       @staticmethod
-      async def get_user_tenders(username, limit, offset) -> List[TenderORM]:
+      async def stream_tenders(service_type, after: Optional[str] = None) -> AsyncIterator[List[TenderRow]]:
+            params = {}
+            if service_type and isinstance(service_type, list):
+                  params['types'] = sorted({ServiceTypeEnum(t).name for t in service_type})
+
+            if after:
+                  params['after_name'], params['after_id'] = decode_cursor(after)
+                  query = queries.TENDER_EXPORT_AFTER_BY_TYPE if 'types' in params else queries.TENDER_EXPORT_AFTER
+            else:
+                  query = queries.TENDER_EXPORT_BY_TYPE if 'types' in params else queries.TENDER_EXPORT
+
             try:
-                  async with new_session() as session:
-                        query = text('SELECT * FROM tenders JOIN employee ON employee.username = tenders."creatorUsername" WHERE employee.username = :username ORDER BY name LIMIT :limit OFFSET :offset;')
-                        
-                        result = await session.execute(query, {'username': username, 'limit': limit, 'offset': offset})
-                        
-                        tenders_list = [TenderORM(
-                              id = i[0],
-                              name = i[1],
-                              description = i[2],
-                              serviceType = i[3],
-                              status = i[4],
-                              organizationId = str(i[6]),
-                              creatorUsername = i[7],
-                              created_at = i[8],
-                              updated_at = i[9]
-                        ) for i in result.fetchall()]
-                        
-                        return tenders_list
+                  # the export outlives the request-scoped session, so it holds its own
+                  async with new_read_session() as session:
+                        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE), params)
+                        async for partition in result.partitions():
+                              yield [TenderRow(*row) for row in partition]
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
-      
+
       @staticmethod
-      async def edit_tender(tenderId: str, data: Dict[str, Any]):
+      async def get_tender_status(session: AsyncSession, id: str) -> Optional[StatusRow]:
+            cached = status_cache.get('tender', id)
+            if cached is not MISSING:
+                  return cached
+
             try:
-                  async with new_session() as session:
-                        query = text('UPDATE tenders SET name = :name, description = :description, "serviceType" = :serviceType, version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = :id;')
-                        
-                        await session.execute(query, {'id': tenderId, 'name': data['name'], 'description': data['description'], 'serviceType': data['serviceType']})
-                        await session.commit()
-                        print('ok')
-                        query = text('SELECT * FROM tenders WHERE id = :id;')
-                        result = await session.execute(query, {'id': tenderId})
-                        
-                        tenders_list = [TenderORM(
-                              id = tenderId,
-                              name = i[1],
-                              description = i[2],
-                              serviceType = i[3],
-                              status = i[4],
-                              version = i[5],
-                              organizationId = str(i[6]),
-                              creatorUsername = i[7],
-                              created_at = i[8],
-                              updated_at = i[9]
-                        ) for i in result.fetchall()]
-
-                        return tenders_list[0]
+                  result = await session.execute(queries.TENDER_STATUS, {'id': id})
+                  row = result.first()
+                  if row is None:
+                        return None
+
+                  status_row = StatusRow(*row)
+                  status_cache.put('tender', id, status_row)
+                  return status_row
             except SQLAlchemyError as e:
                   raise ValueError(f"Database error: {str(e)}")
             except KeyError as e:
                   raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
                   raise ValueError(f"Unexpected error: {str(e)}")
+
+      @staticmethod
+      async def get_user_tenders(session: AsyncSession, username, limit, offset) -> List[TenderRow]:
+            try:
+                  params = {'username': username, 'limit': limit, 'offset': offset}
+                  return await read_flight.do(flight_key(queries.TENDER_USER_LIST, params, session.bind), lambda: _fetch_tenders(session, queries.TENDER_USER_LIST, params))
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except Exception as e:
+                  raise ValueError(f"Unexpected error: {str(e)}")
       
       @staticmethod
-      async def user_exists(username: str):
+      async def edit_tender(session: AsyncSession, tenderId: str, data: Dict[str, Any]):
             try:
-                  async with new_session() as session:
-
-                        check_query = text('SELECT id FROM employee WHERE username = :username;')
-                        result = await session.execute(check_query, {'username': username})
-                        user_id = result.scalar()
+                  result = await session.execute(queries.TENDER_EDIT, {'id': tenderId, 'name': data['name'], 'description': data['description'], 'serviceType': ServiceTypeEnum(data['serviceType']).name})
+                  row = result.first()
+                  if row is None:
+                        return None
 
-                        return user_id
+                  _invalidate_status(session, tenderId)
 
+                  *columns, previous_service_type = row
+                  tender = TenderRow(*columns)
+                  _invalidate_listings(session, {previous_service_type, tender.serviceType})
+                  return tender
+            except SQLAlchemyError as e:
+                  raise ValueError(f"Database error: {str(e)}")
+            except KeyError as e:
+                  raise ValueError(f"Missing field: {str(e)}")
             except Exception as e:
-                  raise ValueError(f"Unexpected error: {str(e)}")
\ No newline at end of file
+                  raise ValueError(f"Unexpected error: {str(e)}")
+      
+      @staticmethod
+      async def user_exists(session: AsyncSession, username: str):
+            return await EmployeeRepository.user_exists(session, username)
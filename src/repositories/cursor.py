@@ -0,0 +1,19 @@
+import base64
+import json
+import uuid
+
+from typing import Any, Tuple
+
+def encode_cursor(name: str, id: Any) -> str:
+      raw = json.dumps([name, str(id)], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+      return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, uuid.UUID]:
+      try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            name, id = json.loads(raw)
+            if not isinstance(name, str) or not isinstance(id, str):
+                  raise ValueError('name and id must be strings')
+            return name, uuid.UUID(id)
+      except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {str(e)}")
@@ -0,0 +1,61 @@
+import asyncio
+import weakref
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from sqlalchemy.sql.elements import TextClause
+
+from config import SINGLE_FLIGHT_ENABLED
+from metrics import observe_single_flight
+
+def flight_key(query: TextClause, params: Dict[str, Any], bind: Any) -> Hashable:
+      # a reader routed to the primary must not share a replica's possibly older result, so the engine is part of the key
+      name = query.get_execution_options().get('statement_name', query.text)
+      return (name, bind, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items())))
+
+class SingleFlight:
+      def __init__(self, enabled: bool = True):
+            self.enabled = enabled
+            self._calls: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]' = weakref.WeakKeyDictionary()
+
+      async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+            if not self.enabled:
+                  return await fn()
+
+            statement = key[0] if isinstance(key, tuple) else 'other'
+            loop = asyncio.get_running_loop()
+            calls = self._calls.get(loop)
+            if calls is None:
+                  calls = self._calls[loop] = {}
+
+            call = calls.get(key)
+            if call is not None:
+                  observe_single_flight(statement, 'shared')
+                  try:
+                        return await asyncio.shield(call)
+                  except asyncio.CancelledError:
+                        if not call.cancelled():
+                              raise
+                  # the leader's request went away mid-query; run it again rather than fail this caller
+                  return await self.do(key, fn)
+
+            observe_single_flight(statement, 'leader')
+            call = calls[key] = loop.create_future()
+            try:
+                  result = await fn()
+            except asyncio.CancelledError:
+                  call.cancel()
+                  raise
+            except BaseException as e:
+                  call.set_exception(e)
+                  # followers re-raise it; without them nobody would retrieve it
+                  call.exception()
+                  raise
+            else:
+                  call.set_result(result)
+                  return result
+            finally:
+                  if calls.get(key) is call:
+                        del calls[key]
+
+read_flight = SingleFlight(enabled=SINGLE_FLIGHT_ENABLED)
@@ -0,0 +1,47 @@
+import asyncio
+import weakref
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class BatchLoader:
+      def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]], delay: float = 0.0, max_batch_size: int = 500):
+            self._batch_fn = batch_fn
+            self._delay = delay
+            self._max_batch_size = max_batch_size
+            self._pending: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]' = weakref.WeakKeyDictionary()
+
+      async def load(self, key: Hashable) -> Any:
+            loop = asyncio.get_running_loop()
+            pending = self._pending.get(loop)
+            if pending is None:
+                  pending = self._pending[loop] = {}
+                  if self._delay > 0:
+                        loop.call_later(self._delay, self._dispatch, loop)
+                  else:
+                        loop.call_soon(self._dispatch, loop)
+
+            future = pending.get(key)
+            if future is None:
+                  future = pending[key] = loop.create_future()
+                  if len(pending) >= self._max_batch_size:
+                        self._dispatch(loop)
+
+            return await asyncio.shield(future)
+
+      def _dispatch(self, loop: asyncio.AbstractEventLoop):
+            pending = self._pending.pop(loop, None)
+            if pending:
+                  loop.create_task(self._resolve(pending))
+
+      async def _resolve(self, pending: Dict[Hashable, asyncio.Future]):
+            try:
+                  results = await self._batch_fn(list(pending))
+            except Exception as e:
+                  for future in pending.values():
+                        if not future.done():
+                              future.set_exception(e)
+                  return
+
+            for key, future in pending.items():
+                  if not future.done():
+                        future.set_result(results.get(key))
@@ -0,0 +1,165 @@
+import uuid
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.sql import text
+from sqlalchemy.sql.elements import TextClause
+
+from repositories.rows import TENDER_COLUMNS, BID_COLUMNS
+
+STATEMENTS: Dict[str, TextClause] = {}
+WARMUP: List[Tuple[TextClause, Dict[str, Any]]] = []
+
+NIL_ID = uuid.UUID(int=0)
+
+def statement(name: str, sql: str, warmup: Optional[Dict[str, Any]] = None) -> TextClause:
+      query = text(sql).execution_options(statement_name=name)
+      STATEMENTS[name] = query
+      if warmup is not None:
+            WARMUP.append((query, warmup))
+      return query
+
+# tenders
+
+TENDER_CREATE = statement('tenders.create',
+      'INSERT INTO tenders (id, name, description, "serviceType", status, version, "organizationId", "creatorUsername") '
+      'VALUES (:id, :name, :description, :serviceType, :status, 1, :organizationId, :creatorUsername) RETURNING id;')
+
+TENDER_LIST = statement('tenders.list',
+      f'SELECT {TENDER_COLUMNS} FROM tenders ORDER BY name, id LIMIT :limit OFFSET :offset;',
+      warmup={'limit': 0, 'offset': 0})
+
+TENDER_LIST_BY_TYPE = statement('tenders.list_by_type',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE "serviceType" = ANY(:types) ORDER BY name, id LIMIT :limit OFFSET :offset;',
+      warmup={'types': ['DELIVERY'], 'limit': 0, 'offset': 0})
+
+TENDER_LIST_AFTER = statement('tenders.list_after',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE (name, id) > (:after_name, :after_id) ORDER BY name, id LIMIT :limit;',
+      warmup={'after_name': '', 'after_id': NIL_ID, 'limit': 0})
+
+TENDER_LIST_AFTER_BY_TYPE = statement('tenders.list_after_by_type',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE (name, id) > (:after_name, :after_id) AND "serviceType" = ANY(:types) ORDER BY name, id LIMIT :limit;',
+      warmup={'after_name': '', 'after_id': NIL_ID, 'types': ['DELIVERY'], 'limit': 0})
+
+# exports walk the whole keyset order through a server-side cursor, so they carry no LIMIT
+
+TENDER_EXPORT = statement('tenders.export',
+      f'SELECT {TENDER_COLUMNS} FROM tenders ORDER BY name, id;')
+
+TENDER_EXPORT_BY_TYPE = statement('tenders.export_by_type',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE "serviceType" = ANY(:types) ORDER BY name, id;')
+
+TENDER_EXPORT_AFTER = statement('tenders.export_after',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE (name, id) > (:after_name, :after_id) ORDER BY name, id;')
+
+TENDER_EXPORT_AFTER_BY_TYPE = statement('tenders.export_after_by_type',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE (name, id) > (:after_name, :after_id) AND "serviceType" = ANY(:types) ORDER BY name, id;')
+
+TENDER_STATUS = statement('tenders.status',
+      'SELECT status, version, updated_at FROM tenders WHERE id = :id;',
+      warmup={'id': NIL_ID})
+
+TENDER_USER_LIST = statement('tenders.user_list',
+      f'SELECT {TENDER_COLUMNS} FROM tenders WHERE "creatorUsername" = :username ORDER BY name, id LIMIT :limit OFFSET :offset;',
+      warmup={'username': '', 'limit': 0, 'offset': 0})
+
+TENDER_IDS = statement('tenders.ids',
+      'SELECT id FROM tenders WHERE id = ANY(:ids);',
+      warmup={'ids': []})
+
+# enum columns hold member names ('DELIVERY', not 'Delivery'), so every path binds ServiceTypeEnum(...).name and the like;
+# bulk inserts cast the name arrays to the enum array types
+TENDER_CREATE_MANY = statement('tenders.create_many',
+      'INSERT INTO tenders (id, name, description, "serviceType", status, version, "organizationId", "creatorUsername") '
+      'SELECT id, name, description, "serviceType", status, 1, "organizationId", "creatorUsername" FROM unnest('
+      'CAST(:ids AS uuid[]), CAST(:names AS varchar[]), CAST(:descriptions AS varchar[]), CAST(:serviceTypes AS servicetypeenum[]), '
+      'CAST(:statuses AS statustenderenum[]), CAST(:organizationIds AS uuid[]), CAST(:creatorUsernames AS varchar[])'
+      ') AS t(id, name, description, "serviceType", status, "organizationId", "creatorUsername") '
+      f'ON CONFLICT (name) DO NOTHING RETURNING {TENDER_COLUMNS};')
+
+# the previous service type comes back too, so listings of both the old and the new type can be invalidated
+TENDER_EDIT = statement('tenders.edit',
+      'UPDATE tenders SET name = :name, description = :description, "serviceType" = :serviceType, version = version + 1, updated_at = CURRENT_TIMESTAMP '
+      'FROM (SELECT id AS previous_id, "serviceType" AS "previousServiceType" FROM tenders WHERE id = :id FOR UPDATE) AS previous '
+      'WHERE id = previous.previous_id '
+      f'RETURNING {TENDER_COLUMNS}, previous."previousServiceType";')
+
+# bids
+
+BID_CREATE = statement('bids.create',
+      'INSERT INTO bids (id, name, description, status, "tenderId", "authorType", "authorId", version) '
+      'VALUES (:id, :name, :description, :status, :tenderId, :authorType, :authorId, 1) '
+      f'RETURNING {BID_COLUMNS};')
+
+BID_CREATE_MANY = statement('bids.create_many',
+      'INSERT INTO bids (id, name, description, status, "tenderId", "authorType", "authorId", version) '
+      'SELECT id, name, description, status, "tenderId", "authorType", "authorId", 1 FROM unnest('
+      'CAST(:ids AS uuid[]), CAST(:names AS varchar[]), CAST(:descriptions AS varchar[]), CAST(:statuses AS statusbidenum[]), '
+      'CAST(:tenderIds AS uuid[]), CAST(:authorTypes AS bidauthortypeenum[]), CAST(:authorIds AS uuid[])'
+      ') AS b(id, name, description, status, "tenderId", "authorType", "authorId") '
+      f'ON CONFLICT (name) DO NOTHING RETURNING {BID_COLUMNS};')
+
+BID_USER_LIST = statement('bids.user_list',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."authorId" = (SELECT id FROM employee WHERE employee.username = :username) '
+      'ORDER BY bids.name, bids.id LIMIT :limit OFFSET :offset;',
+      warmup={'username': '', 'limit': 0, 'offset': 0})
+
+BID_USER_LIST_AFTER = statement('bids.user_list_after',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."authorId" = (SELECT id FROM employee WHERE employee.username = :username) '
+      'AND (bids.name, bids.id) > (:after_name, :after_id) ORDER BY bids.name, bids.id LIMIT :limit;',
+      warmup={'username': '', 'after_name': '', 'after_id': NIL_ID, 'limit': 0})
+
+BID_TENDER_LIST = statement('bids.tender_list',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."tenderId" = :id ORDER BY bids.name, bids.id LIMIT :limit OFFSET :offset;',
+      warmup={'id': NIL_ID, 'limit': 0, 'offset': 0})
+
+BID_TENDER_LIST_AFTER = statement('bids.tender_list_after',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."tenderId" = :id AND (bids.name, bids.id) > (:after_name, :after_id) ORDER BY bids.name, bids.id LIMIT :limit;',
+      warmup={'id': NIL_ID, 'after_name': '', 'after_id': NIL_ID, 'limit': 0})
+
+BID_TENDER_EXPORT = statement('bids.tender_export',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."tenderId" = :id ORDER BY bids.name, bids.id;')
+
+BID_TENDER_EXPORT_AFTER = statement('bids.tender_export_after',
+      f'SELECT {BID_COLUMNS} FROM bids WHERE bids."tenderId" = :id AND (bids.name, bids.id) > (:after_name, :after_id) ORDER BY bids.name, bids.id;')
+
+BID_EDIT = statement('bids.edit',
+      'UPDATE bids SET name = :name, description = :description, version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = :id '
+      f'RETURNING {BID_COLUMNS};')
+
+BID_DECISION = statement('bids.decision',
+      'UPDATE bids SET decision = :decision, version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = :id '
+      f'RETURNING {BID_COLUMNS};')
+
+BID_STATUS = statement('bids.status',
+      'SELECT status, version, updated_at FROM bids WHERE id = :id;',
+      warmup={'id': NIL_ID})
+
+BID_FEEDBACK = statement('bids.feedback',
+      'WITH review AS (INSERT INTO bids_reviews (id, "userName", description, "bidId") VALUES (:reviewId, :username, :description, :bidId)) '
+      'UPDATE bids SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = :bidId '
+      f'RETURNING {BID_COLUMNS};')
+
+# employee
+
+EMPLOYEE_ID = statement('employee.id',
+      'SELECT id FROM employee WHERE username = :username;',
+      warmup={'username': ''})
+
+EMPLOYEE_USERNAME = statement('employee.username',
+      'SELECT username FROM employee WHERE id = :id;',
+      warmup={'id': NIL_ID})
+
+EMPLOYEE_IDS = statement('employee.ids',
+      'SELECT username, id FROM employee WHERE username = ANY(:names);',
+      warmup={'names': []})
+
+EMPLOYEE_USERNAMES = statement('employee.usernames',
+      'SELECT id, username FROM employee WHERE id = ANY(:ids);',
+      warmup={'ids': []})
+
+# organization
+
+ORGANIZATION_IDS = statement('organization.ids',
+      'SELECT id FROM organization WHERE id = ANY(:ids);',
+      warmup={'ids': []})
@@ -0,0 +1,43 @@
+import uuid
+
+from dataclasses import dataclass
+from datetime import datetime
+
+TENDER_COLUMNS = 'id, name, description, "serviceType", status, version, "organizationId", "creatorUsername", created_at, updated_at'
+
+BID_COLUMNS = 'id, name, status, "authorType", "authorId", version, created_at'
+
+@dataclass
+class TenderRow:
+      __slots__ = ('id', 'name', 'description', 'serviceType', 'status', 'version', 'organizationId', 'creatorUsername', 'created_at', 'updated_at')
+
+      id: uuid.UUID
+      name: str
+      description: str
+      serviceType: str
+      status: str
+      version: int
+      organizationId: uuid.UUID
+      creatorUsername: str
+      created_at: datetime
+      updated_at: datetime
+
+@dataclass
+class BidRow:
+      __slots__ = ('id', 'name', 'status', 'authorType', 'authorId', 'version', 'created_at')
+
+      id: uuid.UUID
+      name: str
+      status: str
+      authorType: str
+      authorId: uuid.UUID
+      version: int
+      created_at: datetime
+
+@dataclass
+class StatusRow:
+      __slots__ = ('status', 'version', 'updated_at')
+
+      status: str
+      version: int
+      updated_at: datetime
@@ -1,17 +1,24 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
+from fastapi.responses import StreamingResponse
 
-from typing import Optional, Literal
+from typing import List, Optional, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config import BULK_MAX_ITEMS
+from schemas.db.config_db import get_session, get_read_session, remember_write
 from repositories.Bid import BidRepository
+from repositories.cursor import decode_cursor, encode_cursor
+from routing.conditional import entity_tag, row_set_tag, not_modified, not_modified_response, validator_headers
+from routing.responses import FastJSONResponse, NDJSON_MEDIA_TYPE, bulk_content, ndjson_stream
 from schemas.bidModels.BidCreateModel import BidCreateModel
 from schemas.bidModels.BidEditModel import BidEditModel
+from schemas.db.models import BidAuthorTypeEnum
 
-bids_router = APIRouter()
+bids_router = APIRouter(default_response_class=FastJSONResponse)
 
 @bids_router.post('/bids/new',
             responses={
@@ -64,7 +71,8 @@ bids_router = APIRouter()
       }                   
 )
 async def createBid(
-      request_body: BidCreateModel
+      request_body: BidCreateModel,
+      session: AsyncSession = Depends(get_session)
       ):
       try:
             params = {
@@ -75,21 +83,14 @@ async def createBid(
                   'authorId': request_body.authorId
             }
 
-            author_name = await BidRepository.user_exists_by_id(request_body.authorId)
+            author_name = await BidRepository.user_exists_by_id(session, request_body.authorId)
             if not author_name:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this id does not exist')
 
-            bid = await BidRepository.create_bid(params)
+            bid = await BidRepository.create_bid(session, params)
             if bid:
-                  return {
-                        "id": bid['id'],
-                        "name": bid['name'],
-                        "status": bid['status'],
-                        "authorType": bid['authorType'],
-                        "authorId": bid['authorId'],
-                        "version": bid['version'],
-                        "created_at": bid['created_at']
-                  }
+                  remember_write(author_name)
+                  return FastJSONResponse(content=bid, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to create bid")
       except HTTPException as e:
@@ -100,6 +101,57 @@ async def createBid(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
       except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@bids_router.post('/bids/bulk',
+            responses={
+            200: {
+                  "description": "Результат создания каждого предложения из списка, в порядке запроса.",
+                  "content": {
+                  "application/json": {
+                        'example': {
+                              "created": 1,
+                              "failed": 1,
+                              "results": [
+                                    {"index": 0, "status": "created", "bid": {"id": "550e8400-e29b-41d4-a716-446655440000", "name": "Доставка товаров Алексей", "status": "Created", "authorType": "User", "authorId": "61a485f0-e29b-41d4-a716-446655440000", "version": 1}},
+                                    {"index": 1, "status": "error", "reason": "Tender not found"}
+                              ]
+                              }
+                        }
+                  }
+            },
+            400: {
+                  'description': f'Пустой список или больше {BULK_MAX_ITEMS} предложений.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": f"Expected from 1 to {BULK_MAX_ITEMS} items"
+                              }
+                        }
+                  }
+            }
+      }
+)
+async def createBidsBulk(
+      request_body: List[BidCreateModel],
+      session: AsyncSession = Depends(get_session)
+      ):
+      if not request_body or len(request_body) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Expected from 1 to {BULK_MAX_ITEMS} items')
+
+      try:
+            results = await BidRepository.create_bids(session, [item.model_dump() for item in request_body])
+            # the authors were looked up while validating, so their usernames come from the identity cache
+            authors = await BidRepository.users_exist_by_id(session,
+                  [row.authorId for row, error in results if error is None and row.authorType == BidAuthorTypeEnum.USER.name])
+            for author in set(authors.values()):
+                  remember_write(author)
+            return FastJSONResponse(content=bulk_content(results, 'bid'), status_code=status.HTTP_200_OK)
+      except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+      except PermissionError:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+      except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
       
 @bids_router.get('/bids/my',
             responses={
@@ -164,28 +216,37 @@ async def createBid(
       } 
 )
 async def getUserBids(
-      limit: Optional[int] = Query(5, max_length=50, alias="paginationLimit"),
+      request: Request,
+      limit: Optional[int] = Query(5, le=50, alias="paginationLimit"),
       offset: Optional[int] = Query(0, alias="paginationOffset"),
       username: Optional[str] = None,
+      after: Optional[str] = Query(None, alias="after"),
+      session: AsyncSession = Depends(get_read_session)
       ):
       try:
             if limit < 0 or offset < 0:
                   raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Incorrect limit or offset')
             
-            user_id = await BidRepository.user_exists(username)
+            user_id = await BidRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
 
-            bids = await BidRepository.get_user_bids(username, limit=limit, offset=offset)
+            bids = await BidRepository.get_user_bids(session, username, limit=limit, offset=offset, after=after)
             if bids:
-                  bids = sorted(bids, key=lambda b: b['name'])
-                  return bids
+                  headers = validator_headers(row_set_tag(bids))
+                  if len(bids) == limit:
+                        headers['X-Next-Cursor'] = encode_cursor(bids[-1].name, bids[-1].id)
+                  if not_modified(request, headers['ETag']):
+                        return not_modified_response(headers)
+                  return FastJSONResponse(content=bids, headers=headers, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No bids for this user')
       except HTTPException as e:
             raise e
       except PermissionError:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+      except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
       except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -253,20 +314,27 @@ async def getUserBids(
 )
 async def getBidsForTender(
       tenderId: str,
+      request: Request,
       username: str,
-      limit: Optional[int] = Query(5, max_length=50, alias="paginationLimit"),
+      limit: Optional[int] = Query(5, le=50, alias="paginationLimit"),
       offset: Optional[int] = Query(0, alias="paginationOffset"),
+      after: Optional[str] = Query(None, alias="after"),
+      session: AsyncSession = Depends(get_read_session)
       ):
       try:
-            user_id = await BidRepository.user_exists(username)
+            user_id = await BidRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
 
-            bids = await BidRepository.get_bids_for_tender(tenderId, limit, offset)
+            bids = await BidRepository.get_bids_for_tender(session, tenderId, limit, offset, after=after)
             
             if bids:
-                  bids = sorted(bids, key=lambda b: b['name'])
-                  return bids
+                  headers = validator_headers(row_set_tag(bids))
+                  if len(bids) == limit:
+                        headers['X-Next-Cursor'] = encode_cursor(bids[-1].name, bids[-1].id)
+                  if not_modified(request, headers['ETag']):
+                        return not_modified_response(headers)
+                  return FastJSONResponse(content=bids, headers=headers, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Tender or bids not found')
       except HTTPException as e:
@@ -278,6 +346,74 @@ async def getBidsForTender(
       except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@bids_router.get('/bids/{tenderId}/export',
+            response_class=StreamingResponse,
+            responses={
+            200: {
+                  "description": "Все предложения по тендеру в порядке (name, id), по одному JSON-объекту на строку. Поле cursor позволяет продолжить выгрузку с этого места через параметр after.",
+                  "content": {
+                  NDJSON_MEDIA_TYPE: {
+                        'example': '{"id": "550e8400-e29b-41d4-a716-446655440000", "name": "Доставка товаров Алексей", "status": "Created", "authorType": "User", "authorId": "61a485f0-e29b-41d4-a716-446655440000", "version": 1, "cursor": "WyLQlNC-0YHRgtCw0LLQutCwIiwiNTUwZTg0MDAiXQ"}'
+                        }
+                  }
+            },
+            400: {
+                  'description': 'Решение не может быть отправлено.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": "<объяснение, почему запрос пользователя не может быть обработан>"
+                              }
+                        }
+                  }
+            },
+            401: {
+                  'description': 'Пользователь не существует или некорректен.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": "<объяснение, почему запрос пользователя не может быть обработан>"
+                              }
+                        }
+                  }
+            },
+            404: {
+                  'description': 'Тендер не найден.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": "<объяснение, почему запрос пользователя не может быть обработан>"
+                              }
+                        }
+                  }
+            }
+      }
+)
+async def exportBidsForTender(
+      tenderId: str,
+      username: str,
+      after: Optional[str] = Query(None, alias="after"),
+      session: AsyncSession = Depends(get_read_session)
+      ):
+      try:
+            if after:
+                  decode_cursor(after)
+
+            user_id = await BidRepository.user_exists(session, username)
+            if not user_id:
+                  raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
+
+            if not await BidRepository.tender_exists(session, tenderId):
+                  raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Tender not found')
+      except HTTPException as e:
+            raise e
+      except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+      except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+      return StreamingResponse(ndjson_stream(BidRepository.stream_bids_for_tender(tenderId, after=after)), media_type=NDJSON_MEDIA_TYPE)
+
 @bids_router.get('/bids/{bidId}/status',
             responses={
             200: {
@@ -332,16 +468,21 @@ async def getBidsForTender(
 )
 async def getBidStatus(
       bidId: str,
-      username: str
+      request: Request,
+      username: str,
+      session: AsyncSession = Depends(get_read_session)
       ):
       try:
-            result = await BidRepository.user_exists(username)
+            result = await BidRepository.user_exists(session, username)
             if not result:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
 
-            bid_status = await BidRepository.get_bid_status(bidId)
+            bid_status = await BidRepository.get_bid_status(session, bidId)
             if bid_status:
-                  return JSONResponse(content=bid_status, status_code=status.HTTP_200_OK)
+                  headers = validator_headers(entity_tag(bid_status.version, bid_status.updated_at), bid_status.updated_at)
+                  if not_modified(request, headers['ETag'], bid_status.updated_at):
+                        return not_modified_response(headers)
+                  return FastJSONResponse(content=bid_status.status, headers=headers, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bid not found')
       except HTTPException as e:
@@ -416,10 +557,11 @@ async def getBidStatus(
 async def editBid(
       bidId: str,
       username: str,
-      request_body: BidEditModel
+      request_body: BidEditModel,
+      session: AsyncSession = Depends(get_session)
       ):
       try:
-            user_id = await BidRepository.user_exists(username)
+            user_id = await BidRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
             
@@ -428,10 +570,11 @@ async def editBid(
                   'description': request_body.description
             }
 
-            edited_bid = await BidRepository.edit_bid(bidId, params)
+            edited_bid = await BidRepository.edit_bid(session, bidId, params)
             
             if edited_bid:
-                  return edited_bid
+                  remember_write(username)
+                  return FastJSONResponse(content=edited_bid, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bid not found')
       except HTTPException as e:
@@ -504,23 +647,25 @@ async def editBid(
 async def submitBidDecision(
       bidId: str,
       bidDecision: Literal['Approved', 'Rejected'],
-      username: str
+      username: str,
+      session: AsyncSession = Depends(get_session)
       ):
       try:
-            user_id = await BidRepository.user_exists(username)
+            user_id = await BidRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
 
-            result = await BidRepository.submit_decision(bidId, bidDecision)
+            result = await BidRepository.submit_decision(session, bidId, bidDecision)
             if result:
-                  return JSONResponse(content={
-                        'id': str(result[0]),
-                        'name': result[1],
-                        'status': result[3],
-                        'authorType': result[4],
-                        'authorId': str(result[5]),
-                        'version': result[6],
-                        'createdAt': str(result[9])
+                  remember_write(username)
+                  return FastJSONResponse(content={
+                        'id': result.id,
+                        'name': result.name,
+                        'status': result.status,
+                        'authorType': result.authorType,
+                        'authorId': result.authorId,
+                        'version': result.version,
+                        'createdAt': result.created_at
                   }, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bid not found')
@@ -596,23 +741,25 @@ async def submitBidDecision(
 async def submitBidFeedback(
       bidId: str,
       bidFeedback: str,
-      username: str
+      username: str,
+      session: AsyncSession = Depends(get_session)
       ):
       try:
-            user_id = await BidRepository.user_exists(username)
+            user_id = await BidRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User with this username does not exist')
             
-            result = await BidRepository.submit_bid_feedback(bidId, username, bidFeedback)
+            result = await BidRepository.submit_bid_feedback(session, bidId, username, bidFeedback)
             if result:
-                  return JSONResponse(content={
-                        'id': str(result[0]),
-                        'name': result[1],
-                        'status': result[3],
-                        'authorType': result[4],
-                        'authorId': str(result[5]),
-                        'version': result[6],
-                        'createdAt': str(result[9])
+                  remember_write(username)
+                  return FastJSONResponse(content={
+                        'id': result.id,
+                        'name': result.name,
+                        'status': result.status,
+                        'authorType': result.authorType,
+                        'authorId': result.authorId,
+                        'version': result.version,
+                        'createdAt': result.created_at
                   }, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bid not found')
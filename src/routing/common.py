@@ -1,5 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import PlainTextResponse
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from fastapi.responses import PlainTextResponse, JSONResponse, Response
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import render_metrics
+from config import DB_READ_MAX_OVERFLOW
+from schemas.db.config_db import pool_stats, read_engines
 
 common_router = APIRouter()
 
@@ -8,4 +16,25 @@ def checkServer():
       try:
             return PlainTextResponse(content='ok', status_code=status.HTTP_200_OK)
       except Exception as e:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@common_router.get('/ready')
+def checkReady(request: Request):
+      if getattr(request.app.state, 'ready', False):
+            return PlainTextResponse(content='ok', status_code=status.HTTP_200_OK)
+      return PlainTextResponse(content='warming up', status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@common_router.get('/pool')
+def getPoolStats():
+      try:
+            content = pool_stats()
+            if read_engines:
+                  content['read'] = [pool_stats(e, DB_READ_MAX_OVERFLOW) for e in read_engines]
+            return JSONResponse(content=content, status_code=status.HTTP_200_OK)
+      except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@common_router.get('/metrics')
+def getMetrics():
+      content, media_type = render_metrics()
+      return Response(content=content, media_type=media_type, status_code=status.HTTP_200_OK)
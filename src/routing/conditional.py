@@ -0,0 +1,59 @@
+import hashlib
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+def entity_tag(version: int, updated_at: Optional[datetime]) -> str:
+      stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+      return f'W/"{version}-{stamp:x}"'
+
+def row_set_tag(rows: Iterable[Any]) -> str:
+      # a page changes whenever a row enters, leaves or moves, or any row's version or status moves
+      digest = hashlib.blake2b(digest_size=16)
+      for row in rows:
+            digest.update(row.id.bytes)
+            digest.update(f'{row.version}:{row.status};'.encode())
+      return f'W/"{digest.hexdigest()}"'
+
+def http_date(value: datetime) -> str:
+      if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+      return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _opaque(tag: str) -> str:
+      tag = tag.strip()
+      return tag[2:] if tag.startswith('W/') else tag
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+      if_none_match = request.headers.get('if-none-match')
+      if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                  return True
+            # weak comparison, as required for If-None-Match
+            return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(',')}
+
+      if_modified_since = request.headers.get('if-modified-since')
+      if if_modified_since is None or last_modified is None:
+            return False
+      try:
+            since = parsedate_to_datetime(if_modified_since)
+      except (TypeError, ValueError):
+            return False
+      if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+      if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+      # HTTP dates have whole-second precision
+      return last_modified.replace(microsecond=0) <= since
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+      headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+      if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified)
+      return headers
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+      return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,45 @@
+import orjson
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from repositories.cursor import encode_cursor
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+def _default(obj: Any) -> Any:
+      if isinstance(obj, (set, frozenset)):
+            return list(obj)
+      raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dump_json(content: Any) -> bytes:
+      return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+      def render(self, content: Any) -> bytes:
+            return dump_json(content)
+
+def bulk_content(results: List[Tuple[Any, Optional[str]]], item_key: str) -> Dict[str, Any]:
+      items = []
+      for index, (row, error) in enumerate(results):
+            if error is None:
+                  items.append({'index': index, 'status': 'created', item_key: row})
+            else:
+                  items.append({'index': index, 'status': 'error', 'reason': error})
+
+      created = sum(1 for _, error in results if error is None)
+      return {'created': created, 'failed': len(results) - created, 'results': items}
+
+def _ndjson_line(row: Any) -> bytes:
+      # the row is serialized once and its resume cursor spliced in before the closing brace
+      body = orjson.dumps(row, default=_default)
+      return body[:-1] + b',"cursor":' + orjson.dumps(encode_cursor(row.name, row.id)) + b'}\n'
+
+async def ndjson_stream(batches: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+      try:
+            async for rows in batches:
+                  yield b''.join(_ndjson_line(row) for row in rows)
+      except ValueError as e:
+            # headers are already sent, so a failure is reported in-band; the client resumes from its last cursor
+            yield orjson.dumps({'error': str(e)}) + b'\n'
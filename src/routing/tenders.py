@@ -1,16 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import JSONResponse
-from typing import List, Optional, Literal
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Literal, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from repositories.Tender import TenderRepository
+from cache.response import tender_list_cache, tender_list_tags
+from config import BULK_MAX_ITEMS
+from schemas.db.config_db import get_session, get_read_session, new_read_session, remember_write, wrote_recently
+from repositories.Tender import LISTING_WRITE_KEY, TenderRepository
+from repositories.cursor import decode_cursor, encode_cursor
+from routing.conditional import entity_tag, row_set_tag, not_modified, not_modified_response, validator_headers
+from routing.responses import FastJSONResponse, NDJSON_MEDIA_TYPE, bulk_content, dump_json, ndjson_stream
 from schemas.tenderModels.TenderRequestModel import TenderRequestModel
 from schemas.tenderModels.TenderCreateModel import TenderCreateModel
 
-tenders_router = APIRouter()
+tenders_router = APIRouter(default_response_class=FastJSONResponse)
 
 @tenders_router.post('/tenders/new',
             responses={
@@ -65,7 +72,8 @@ tenders_router = APIRouter()
       } 
 )
 async def createTender(
-      request_body: TenderCreateModel
+      request_body: TenderCreateModel,
+      session: AsyncSession = Depends(get_session)
       ):
       
       try:
@@ -78,13 +86,14 @@ async def createTender(
                   "creatorUsername": request_body.creatorUsername
             }
             
-            creator_id = await TenderRepository.user_exists(request_body.creatorUsername)
-            if creator_id:
+            creator_id = await TenderRepository.user_exists(session, request_body.creatorUsername)
+            if not creator_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User does not exist or invalid')
 
-            id = await TenderRepository.create_tender(params)
+            id = await TenderRepository.create_tender(session, params)
             if id:
-                  return JSONResponse(content={'id': str(id),
+                  remember_write(params['creatorUsername'])
+                  return FastJSONResponse(content={'id': id,
                                             'name': params['name'], 
                                             'description': params['description'], 
                                             'serviceType': params['serviceType'],
@@ -99,6 +108,66 @@ async def createTender(
       except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@tenders_router.post('/tenders/bulk',
+            responses={
+            200: {
+                  "description": "Результат создания каждого тендера из списка, в порядке запроса.",
+                  "content": {
+                  "application/json": {
+                        'example': {
+                              "created": 1,
+                              "failed": 1,
+                              "results": [
+                                    {"index": 0, "status": "created", "tender": {"id": "550e8400-e29b-41d4-a716-446655440000", "name": "Доставка товары Казань - Москва", "status": "Created", "serviceType": "Delivery", "version": 1}},
+                                    {"index": 1, "status": "error", "reason": "User does not exist or invalid"}
+                              ]
+                              }
+                        }
+                  }
+            },
+            400: {
+                  'description': f'Пустой список или больше {BULK_MAX_ITEMS} тендеров.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": f"Expected from 1 to {BULK_MAX_ITEMS} items"
+                              }
+                        }
+                  }
+            }
+      }
+)
+async def createTendersBulk(
+      request_body: List[TenderCreateModel],
+      session: AsyncSession = Depends(get_session)
+      ):
+      if not request_body or len(request_body) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Expected from 1 to {BULK_MAX_ITEMS} items')
+
+      try:
+            results = await TenderRepository.create_tenders(session, [item.model_dump() for item in request_body])
+            for creator in {row.creatorUsername for row, error in results if error is None}:
+                  remember_write(creator)
+            return FastJSONResponse(content=bulk_content(results, 'tender'), status_code=status.HTTP_200_OK)
+      except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+      except PermissionError:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+      except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+async def _load_tender_page(service_type: Optional[List[str]], limit: int, offset: int, after: Optional[str], primary: bool = False) -> Optional[Tuple[bytes, Dict[str, str]]]:
+      async with new_read_session(LISTING_WRITE_KEY, primary) as session:
+            tenders = await TenderRepository.get_all_tenders(session, limit=limit, offset=offset, service_type=service_type, after=after)
+      if not tenders:
+            return None
+
+      # no Last-Modified: rows can enter or leave a page without raising its newest updated_at
+      headers = validator_headers(row_set_tag(tenders))
+      if len(tenders) == limit:
+            headers['X-Next-Cursor'] = encode_cursor(tenders[-1].name, tenders[-1].id)
+      return dump_json(tenders), headers
+
 @tenders_router.get('/tenders',
             responses={
             200: {
@@ -152,18 +221,31 @@ async def createTender(
       }                      
 )
 async def getTenders(
+      request: Request,
       service_type: Optional[List[Literal['Construction', 'Delivery', 'Manufacture']]] = Query(None),
-      limit: Optional[int] = Query(5, max_length=50, alias="limit"),
+      limit: Optional[int] = Query(5, le=50, alias="limit"),
       offset: Optional[int] = Query(0, alias="offset"),
+      after: Optional[str] = Query(None, alias="after")
       ):
       try:
-            tenders = await TenderRepository.get_all_tenders(limit=limit, offset=offset, service_type=service_type)
-            tenders = sorted(tenders, key=lambda t: t.name)
-            
-            if tenders:
-                  return tenders
+            # the listing is anonymous, so the rendered page is shared by every caller and a cache hit takes no connection
+            types = sorted(set(service_type)) if service_type else None
+            key = f"tenders:{','.join(types) if types else '*'}:{limit}:{None if after else offset}:{after}"
+            if wrote_recently(request):
+                  # the shared page may still be the stale copy served while it refreshes
+                  page = await _load_tender_page(types, limit, offset, after, primary=True)
+            else:
+                  page = await tender_list_cache.get_or_load(key, tender_list_tags(types), lambda: _load_tender_page(types, limit, offset, after))
+
+            if page:
+                  body, headers = page
+                  if not_modified(request, headers['ETag']):
+                        return not_modified_response(headers)
+                  return Response(content=body, headers=headers, media_type='application/json', status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Tenders not found')
+      except HTTPException as e:
+            raise e
       except ValueError as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
       except PermissionError:
@@ -171,6 +253,41 @@ async def getTenders(
       except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@tenders_router.get('/tenders/export',
+            response_class=StreamingResponse,
+            responses={
+            200: {
+                  "description": "Все тендеры в порядке (name, id), по одному JSON-объекту на строку. Поле cursor позволяет продолжить выгрузку с этого места через параметр after.",
+                  "content": {
+                  NDJSON_MEDIA_TYPE: {
+                        'example': '{"id": "550e8400-e29b-41d4-a716-446655440000", "name": "Доставка товары Казань - Москва", "status": "Created", "serviceType": "Delivery", "version": 1, "cursor": "WyLQlNC-0YHRgtCw0LLQutCwIiwiNTUwZTg0MDAiXQ"}'
+                        }
+                  }
+            },
+            400: {
+                  'description': 'Решение не может быть отправлено.',
+                  "content": {
+                  "application/json": {
+                        'example': {
+                                    "reason": "<объяснение, почему запрос пользователя не может быть обработан>"
+                              }
+                        }
+                  }
+            }
+      }
+)
+async def exportTenders(
+      service_type: Optional[List[Literal['Construction', 'Delivery', 'Manufacture']]] = Query(None),
+      after: Optional[str] = Query(None, alias="after")
+      ):
+      try:
+            if after:
+                  decode_cursor(after)
+      except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+      return StreamingResponse(ndjson_stream(TenderRepository.stream_tenders(service_type, after=after)), media_type=NDJSON_MEDIA_TYPE)
+
 @tenders_router.get('/tenders/my',
             responses={
             200: {
@@ -234,20 +351,25 @@ async def getTenders(
       }                    
 )
 async def getUserTenders(
+      request: Request,
       username: Optional[str] = None,
-      limit: Optional[int] = Query(5, max_length=50, alias="limit"),
-      offset: Optional[int] = Query(0, alias="offset")
+      limit: Optional[int] = Query(5, le=50, alias="limit"),
+      offset: Optional[int] = Query(0, alias="offset"),
+      session: AsyncSession = Depends(get_read_session)
       ):
       try:
-            user_id = await TenderRepository.user_exists(username)
+            user_id = await TenderRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User does not exist or invalid')
 
-            tenders = await TenderRepository.get_user_tenders(username, limit=limit, offset=offset)
+            tenders = await TenderRepository.get_user_tenders(session, username, limit=limit, offset=offset)
             tenders = sorted(tenders, key=lambda t: t.name)
             
             if tenders:
-                  return tenders
+                  headers = validator_headers(row_set_tag(tenders))
+                  if not_modified(request, headers['ETag']):
+                        return not_modified_response(headers)
+                  return FastJSONResponse(content=tenders, headers=headers, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Tenders not found')
       except HTTPException as e:
@@ -322,27 +444,19 @@ async def getUserTenders(
 async def editTender(
       tenderId: str,
       username: str,
-      request_body: TenderRequestModel
+      request_body: TenderRequestModel,
+      session: AsyncSession = Depends(get_session)
       ):
       try:
-            user_id = await TenderRepository.user_exists(username)
+            user_id = await TenderRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User does not exist or invalid')
 
             params = {'name': request_body.name, 'description': request_body.description, 'serviceType': request_body.serviceType}
-            data = await TenderRepository.edit_tender(tenderId, params)
+            data = await TenderRepository.edit_tender(session, tenderId, params)
             if data:
-                  return JSONResponse(content={'id': str(data.id),
-                                               'name': data.name,
-                                               'description': data.description,
-                                               'serviceType': data.serviceType,
-                                               'status': data.status,
-                                               'version': data.version,
-                                               'organizationId': data.organizationId,
-                                               'creatorUsername': data.creatorUsername,
-                                               'created_at': str(data.created_at),
-                                               'updated_at': str(data.updated_at)
-                                               }, status_code=status.HTTP_200_OK)
+                  remember_write(username)
+                  return FastJSONResponse(content=data, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Not found')
       except HTTPException as e:
@@ -408,16 +522,21 @@ async def editTender(
 )
 async def getTenderStatus(
       tenderId: str,
-      username: Optional[str] = None
+      request: Request,
+      username: Optional[str] = None,
+      session: AsyncSession = Depends(get_read_session)
       ):
       try:
-            user_id = await TenderRepository.user_exists(username)
+            user_id = await TenderRepository.user_exists(session, username)
             if not user_id:
                   raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User does not exist or invalid')
 
-            tender_status = await TenderRepository.get_tender_status(tenderId)
+            tender_status = await TenderRepository.get_tender_status(session, tenderId)
             if tender_status:
-                  return JSONResponse(content=tender_status, status_code=status.HTTP_200_OK)
+                  headers = validator_headers(entity_tag(tender_status.version, tender_status.updated_at), tender_status.updated_at)
+                  if not_modified(request, headers['ETag'], tender_status.updated_at):
+                        return not_modified_response(headers)
+                  return FastJSONResponse(content=tender_status.status, headers=headers, status_code=status.HTTP_200_OK)
             else:
                   raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Tender not found')
       except HTTPException as e:
@@ -1,9 +1,146 @@
 from config import *
 
+import itertools
+import math
+import time
+import uuid
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request
+
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+
+from cache.identity import TTLCache, MISSING
+from metrics import observe_checkout_wait
+
+def _database_url(host: Optional[str]) -> str:
+      # an unset host only fails at the first connection, so modules importing this stay importable
+      port = POSTGRES_PORT
+      if host and ':' in host:
+            host, port = host.rsplit(':', 1)
+      return f"postgresql+asyncpg://{POSTGRES_USERNAME}:{POSTGRES_PASSWORD}@{host}:{port}/{POSTGRES_DATABASE}"
+
+DATABASE_URL = _database_url(POSTGRES_HOST)
+
+def _connect_args() -> Dict[str, Any]:
+      if DB_PGBOUNCER_MODE:
+            # transaction-mode poolers cannot keep server-side prepared statements
+            return {
+                  'statement_cache_size': 0,
+                  'prepared_statement_cache_size': 0,
+                  'prepared_statement_name_func': lambda: f'__asyncpg_{uuid.uuid4()}__'
+            }
+
+      return {
+            'statement_cache_size': DB_STATEMENT_CACHE_SIZE,
+            'prepared_statement_cache_size': DB_STATEMENT_CACHE_SIZE
+      }
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+      # sessions check out a connection at their first statement, so the wait is timed where it happens
+      def _do_get(self):
+            start = time.perf_counter()
+            try:
+                  return super()._do_get()
+            finally:
+                  observe_checkout_wait(time.perf_counter() - start)
+
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+      return create_async_engine(
+            url,
+            poolclass=_TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            connect_args=_connect_args()
+      )
+
+engine = _create_engine(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+
+new_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+# batched identity lookups serve many requests at once, so they get connections request sessions cannot hold
+identity_engine = _create_engine(DATABASE_URL, IDENTITY_POOL_SIZE, 0)
+
+new_identity_session = sessionmaker(identity_engine, class_=AsyncSession, expire_on_commit=False)
+
+read_engines: List[AsyncEngine] = [_create_engine(_database_url(host), DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW) for host in DB_READ_HOSTS]
+
+_read_sessions = itertools.cycle([sessionmaker(e, class_=AsyncSession, expire_on_commit=False) for e in read_engines] or [new_session])
+
+# keys (usernames, or a listing) written recently enough that a replica may not have the change yet
+_recent_writes = TTLCache(READ_YOUR_WRITES_SIZE, READ_YOUR_WRITES_WINDOW, negative_ttl=0)
+
+def remember_write(key: Optional[str]):
+      if key and read_engines:
+            _recent_writes.set(key, True)
+
+def new_read_session(key: Optional[str] = None, primary: bool = False) -> AsyncSession:
+      if primary or (key and _recent_writes.get(key) is not MISSING):
+            return new_session()
+      return next(_read_sessions)()
+
+# the window travels with the client, so the worker serving its next read need not be the one that wrote
+WRITE_COOKIE = 'rw_until'
+
+def wrote_recently(request: Request) -> bool:
+      if not read_engines:
+            return False
+      try:
+            return float(request.cookies.get(WRITE_COOKIE, 0)) > time.time()
+      except ValueError:
+            return False
+
+class ReadYourWritesMiddleware:
+      def __init__(self, app):
+            self.app = app
+            self.max_age = math.ceil(READ_YOUR_WRITES_WINDOW)
+
+      async def __call__(self, scope, receive, send):
+            if scope['type'] != 'http' or not read_engines or scope['method'] in ('GET', 'HEAD', 'OPTIONS'):
+                  await self.app(scope, receive, send)
+                  return
+
+            async def send_wrapper(message):
+                  if message['type'] == 'http.response.start' and message['status'] < 400:
+                        cookie = f'{WRITE_COOKIE}={time.time() + READ_YOUR_WRITES_WINDOW:.3f}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax'
+                        message['headers'] = [*message.get('headers', []), (b'set-cookie', cookie.encode('latin-1'))]
+                  await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+def pool_stats(engine: AsyncEngine = engine, max_overflow: int = DB_MAX_OVERFLOW) -> Dict[str, Any]:
+      pool = engine.pool
+      return {
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': max_overflow,
+            'timeout': pool.timeout()
+      }
+
+async def get_session():
+      async with new_session() as session:
+            try:
+                  yield session
+                  await session.commit()
+            except Exception:
+                  await session.rollback()
+                  raise
+            for callback in session.info.pop('after_commit', ()):
+                  await callback()
 
-DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USERNAME}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DATABASE}"
-engine = create_async_engine(DATABASE_URL)
+async def get_read_session(request: Request):
+      # a client that has just written reads from the primary for READ_YOUR_WRITES_WINDOW seconds
+      async with new_read_session(request.query_params.get('username'), wrote_recently(request)) as session:
+            yield session
 
-new_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
\ No newline at end of file
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]):
+      # runs once the request's transaction is committed; dropped with the transaction on rollback
+      session.info.setdefault('after_commit', []).append(callback)
@@ -0,0 +1,165 @@
+import hashlib
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+MIGRATIONS_TABLE = 'schema_migrations'
+MIGRATIONS_LOCK_KEY = 7310422841
+
+@dataclass(frozen=True)
+class Migration:
+      version: int
+      name: str
+      steps: Tuple[str, ...]
+
+      def describe(self) -> str:
+            return '\n'.join([str(self.version), self.name, *self.steps])
+
+def _create_type(name: str, *labels: str) -> str:
+      # databases created before migrations already have the types, and CREATE TYPE has no IF NOT EXISTS
+      values = ', '.join(f"'{label}'" for label in labels)
+      return f'DO $$ BEGIN CREATE TYPE {name} AS ENUM ({values}); EXCEPTION WHEN duplicate_object THEN NULL; END $$'
+
+# the schema as the models created it before migrations existed; later changes go into new migrations
+MIGRATIONS: List[Migration] = [
+      Migration(1, 'initial schema', (
+            _create_type('organization_type', 'IE', 'LLC', 'JSC'),
+            _create_type('servicetypeenum', 'CONSTRUCTION', 'DELIVERY', 'MANUFACTURE'),
+            _create_type('statustenderenum', 'CREATED', 'PUBLISHED', 'CLOSED'),
+            _create_type('statusbidenum', 'CREATED', 'PUBLISHED', 'CANCELED'),
+            _create_type('bidauthortypeenum', 'ORGANIZATION', 'USER'),
+            'CREATE TABLE IF NOT EXISTS employee ('
+            'id UUID NOT NULL, '
+            'username VARCHAR(50) NOT NULL, '
+            'first_name VARCHAR(50), '
+            'last_name VARCHAR(50), '
+            'created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'PRIMARY KEY (id), '
+            'UNIQUE (username))',
+            'CREATE TABLE IF NOT EXISTS organization ('
+            'id UUID NOT NULL, '
+            'name VARCHAR(100) NOT NULL, '
+            'description TEXT, '
+            'type organization_type, '
+            'created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'PRIMARY KEY (id))',
+            'CREATE TABLE IF NOT EXISTS organization_responsible ('
+            'id UUID NOT NULL, '
+            'organization_id UUID, '
+            'user_id UUID, '
+            'PRIMARY KEY (id), '
+            'FOREIGN KEY (organization_id) REFERENCES organization (id), '
+            'FOREIGN KEY (user_id) REFERENCES employee (id))',
+            'CREATE TABLE IF NOT EXISTS tenders ('
+            'id UUID NOT NULL, '
+            'name VARCHAR(100), '
+            'description VARCHAR(500), '
+            '"serviceType" servicetypeenum NOT NULL, '
+            'status statustenderenum NOT NULL, '
+            'version INTEGER, '
+            '"organizationId" UUID, '
+            '"creatorUsername" VARCHAR, '
+            'created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'PRIMARY KEY (id), '
+            'CONSTRAINT version_value_check CHECK (version >= 1), '
+            'UNIQUE (name), '
+            'FOREIGN KEY ("organizationId") REFERENCES organization (id), '
+            'FOREIGN KEY ("creatorUsername") REFERENCES employee (username))',
+            'CREATE TABLE IF NOT EXISTS bids ('
+            'id UUID NOT NULL, '
+            'name VARCHAR(100), '
+            'description VARCHAR(500), '
+            'status statusbidenum, '
+            '"authorType" bidauthortypeenum, '
+            '"authorId" UUID, '
+            'version INTEGER, '
+            'decision VARCHAR(50), '
+            '"tenderId" UUID, '
+            'created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'PRIMARY KEY (id), '
+            'CONSTRAINT version_value_check CHECK (version >= 1), '
+            'UNIQUE (name), '
+            'FOREIGN KEY ("tenderId") REFERENCES tenders (id))',
+            'CREATE TABLE IF NOT EXISTS bids_reviews ('
+            'id UUID NOT NULL, '
+            '"userName" VARCHAR(100), '
+            'description TEXT, '
+            '"bidId" UUID, '
+            'created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(), '
+            'PRIMARY KEY (id), '
+            'UNIQUE ("userName"), '
+            'FOREIGN KEY ("bidId") REFERENCES bids (id))',
+      )),
+      Migration(2, 'keyset pagination indexes', (
+            'CREATE INDEX IF NOT EXISTS ix_tenders_name_id ON tenders (name, id)',
+            'CREATE INDEX IF NOT EXISTS ix_bids_author_name_id ON bids ("authorId", name, id)',
+            'CREATE INDEX IF NOT EXISTS ix_bids_tender_name_id ON bids ("tenderId", name, id)',
+      )),
+]
+
+def fingerprints(migrations: List[Migration] = MIGRATIONS) -> List[Tuple[int, str]]:
+      result = []
+      previous = ''
+      for migration in migrations:
+            previous = hashlib.sha256((previous + migration.describe()).encode('utf-8')).hexdigest()
+            result.append((migration.version, previous))
+      return result
+
+async def current_version(conn: AsyncConnection) -> Optional[Tuple[int, str]]:
+      exists = await conn.scalar(text('SELECT to_regclass(:table) IS NOT NULL'), {'table': MIGRATIONS_TABLE})
+      if not exists:
+            return None
+
+      result = await conn.execute(text(f'SELECT version, fingerprint FROM {MIGRATIONS_TABLE} ORDER BY version DESC LIMIT 1'))
+      row = result.first()
+      return (row.version, row.fingerprint) if row else None
+
+async def _apply(conn: AsyncConnection, migration: Migration, fingerprint: str):
+      for step in migration.steps:
+            await conn.execute(text(step))
+
+      await conn.execute(
+            text(f'INSERT INTO {MIGRATIONS_TABLE} (version, name, fingerprint) VALUES (:version, :name, :fingerprint)'),
+            {'version': migration.version, 'name': migration.name, 'fingerprint': fingerprint}
+      )
+
+async def migrate(engine: AsyncEngine) -> int:
+      expected = dict(fingerprints())
+      latest = MIGRATIONS[-1].version
+
+      async with engine.connect() as conn:
+            current = await current_version(conn)
+      if current and current[0] >= latest:
+            if current[0] == latest and current[1] != expected[latest]:
+                  raise RuntimeError(f"Schema fingerprint mismatch at version {latest}")
+            return current[0]
+
+      async with engine.begin() as conn:
+            await conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATIONS_LOCK_KEY})
+            await conn.execute(text(
+                  f'CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ('
+                  'version INTEGER PRIMARY KEY, '
+                  'name VARCHAR(200) NOT NULL, '
+                  'fingerprint CHAR(64) NOT NULL, '
+                  'applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)'
+            ))
+
+            result = await conn.execute(text(f'SELECT version, fingerprint FROM {MIGRATIONS_TABLE}'))
+            applied = dict(result.fetchall())
+            for version, fingerprint in applied.items():
+                  if version in expected and expected[version] != fingerprint.strip():
+                        raise RuntimeError(f"Schema fingerprint mismatch at version {version}")
+
+            for migration in MIGRATIONS:
+                  if migration.version not in applied:
+                        await _apply(conn, migration, expected[migration.version])
+
+      return latest
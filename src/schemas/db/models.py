@@ -2,7 +2,7 @@ from config import *
 
 import uuid
 
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, Index
 from sqlalchemy import Enum, Column, String, Integer, Text, ForeignKey, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -82,6 +82,7 @@ class TenderORM(Base):
 
      __table_args__ = (
           CheckConstraint('version >= 1', name='version_value_check'),
+          Index('ix_tenders_name_id', 'name', 'id'),
      )
 
 class StatusBidEnum(PyEnum):
@@ -116,6 +117,8 @@ class BidORM(Base):
 
      __table_args__ = (
           CheckConstraint('version >= 1', name='version_value_check'),
+          Index('ix_bids_author_name_id', 'authorId', 'name', 'id'),
+          Index('ix_bids_tender_name_id', 'tenderId', 'name', 'id'),
      )
 
 class BidReviewsORM(Base):
@@ -0,0 +1,27 @@
+import asyncio
+
+from contextlib import AsyncExitStack
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql.elements import TextClause
+
+async def _prepare(conn: AsyncConnection, statements: Iterable[Tuple[TextClause, Dict[str, Any]]]):
+      trans = await conn.begin()
+      try:
+            for query, params in statements:
+                  await conn.execute(query, params)
+      finally:
+            await trans.rollback()
+
+async def warm_up(engine: AsyncEngine, connections: int, statements: Iterable[Tuple[TextClause, Dict[str, Any]]] = ()) -> int:
+      if connections <= 0:
+            return 0
+
+      statements = list(statements)
+      async with AsyncExitStack() as stack:
+            opened = await asyncio.gather(*[stack.enter_async_context(engine.connect()) for _ in range(connections)])
+            if statements:
+                  await asyncio.gather(*[_prepare(conn, statements) for conn in opened])
+
+      return len(opened)
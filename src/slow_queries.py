@@ -0,0 +1,107 @@
+import datetime
+import json
+import logging
+import os
+import random
+import time
+
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+import greenlet
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger('slow_queries')
+logger.propagate = False
+
+def _caller() -> Optional[str]:
+      # statements run inside a greenlet spawned by the awaiting coroutine,
+      # so the repository frame lives on the parent greenlet's stack
+      current = greenlet.getcurrent()
+      frame = current.parent.gr_frame if current.parent is not None else None
+      while frame is not None:
+            if f'{os.sep}repositories{os.sep}' in frame.f_code.co_filename:
+                  name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+                  return f"{frame.f_globals.get('__name__')}.{name}"
+            frame = frame.f_back
+      return None
+
+def _shape(value: Any) -> str:
+      if isinstance(value, (list, tuple)):
+            return f'{type(value).__name__}[{len(value)}]'
+      return type(value).__name__
+
+def _parameter_shapes(parameters: Any, context) -> Any:
+      if isinstance(parameters, dict):
+            return {key: _shape(value) for key, value in parameters.items()}
+      if isinstance(parameters, (list, tuple)):
+            names = getattr(getattr(context, 'compiled', None), 'positiontup', None)
+            if names and len(names) == len(parameters):
+                  return {name: _shape(value) for name, value in zip(names, parameters)}
+            return [_shape(value) for value in parameters]
+      return _shape(parameters)
+
+def _explain(conn, statement: str, parameters: Any) -> Any:
+      cursor = conn.connection.cursor()
+      cursor.execute('SAVEPOINT slow_query_explain')
+      try:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}', parameters)
+            plan = cursor.fetchall()[0][0]
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return json.loads(plan) if isinstance(plan, str) else plan
+      except Exception:
+            cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            raise
+      finally:
+            cursor.close()
+
+def install_slow_query_log(engine: AsyncEngine, threshold_ms: float, explain_sample_rate: float, path: str, max_bytes: int, backups: int):
+      # the primary and the read engines share one log file
+      if not logger.handlers:
+            path = path.format(pid=os.getpid())
+            directory = os.path.dirname(path)
+            if directory:
+                  os.makedirs(directory, exist_ok=True)
+
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+
+      sync_engine = engine.sync_engine
+
+      @event.listens_for(sync_engine, 'before_cursor_execute')
+      def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+      @event.listens_for(sync_engine, 'handle_error')
+      def _handle_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get('slow_query_start'):
+                  conn.info['slow_query_start'].pop()
+
+      @event.listens_for(sync_engine, 'after_cursor_execute')
+      def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            duration_ms = (time.perf_counter() - conn.info['slow_query_start'].pop()) * 1000
+            if duration_ms < threshold_ms:
+                  return
+
+            record = {
+                  'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                  'duration_ms': round(duration_ms, 3),
+                  'host': sync_engine.url.host,
+                  'statement_name': context.execution_options.get('statement_name') if context is not None else None,
+                  'caller': _caller(),
+                  'statement': statement,
+                  'parameters': _parameter_shapes(parameters, context)
+            }
+
+            if not executemany and statement.lstrip().upper().startswith('SELECT') and random.random() < explain_sample_rate:
+                  try:
+                        record['plan'] = _explain(conn, statement, parameters)
+                  except Exception as e:
+                        record['explain_error'] = str(e)
+
+            logger.info(json.dumps(record, ensure_ascii=False, default=str))
@@ -0,0 +1,13 @@
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+class UvicornWorker(BaseUvicornWorker):
+      CONFIG_KWARGS = {
+            'loop': 'uvloop',
+            'http': 'httptools',
+            'lifespan': 'on',
+            'proxy_headers': True
+      }
+
+      def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
@@ -0,0 +1,66 @@
+import uuid
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from starlette.requests import Request
+
+from routing.conditional import entity_tag, http_date, not_modified, row_set_tag, validator_headers
+
+@dataclass
+class Row:
+      id: uuid.UUID
+      version: int
+      status: str
+
+def _request(**headers) -> Request:
+      return Request({
+            'type': 'http',
+            'method': 'GET',
+            'path': '/',
+            'headers': [(k.replace('_', '-').encode(), v.encode()) for k, v in headers.items()]
+      })
+
+UPDATED = datetime(2026, 1, 2, 3, 4, 5, 678901)
+
+def test_entity_tag_changes_with_version_and_timestamp():
+      tag = entity_tag(1, UPDATED)
+      assert tag.startswith('W/"')
+      assert tag == entity_tag(1, UPDATED)
+      assert tag != entity_tag(2, UPDATED)
+      assert tag != entity_tag(1, UPDATED + timedelta(microseconds=1))
+
+def test_if_none_match_uses_weak_comparison():
+      tag = entity_tag(3, UPDATED)
+      assert not_modified(_request(if_none_match=tag), tag)
+      assert not_modified(_request(if_none_match=tag[2:]), tag)
+      assert not_modified(_request(if_none_match=f'W/"other", {tag}'), tag)
+      assert not_modified(_request(if_none_match='*'), tag)
+      assert not not_modified(_request(if_none_match='W/"other"'), tag)
+      assert not not_modified(_request(), tag)
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+      tag = entity_tag(3, UPDATED)
+      request = _request(if_none_match='W/"other"', if_modified_since=http_date(UPDATED + timedelta(days=1)))
+      assert not not_modified(request, tag, UPDATED)
+
+def test_if_modified_since_compares_whole_seconds():
+      tag = entity_tag(3, UPDATED)
+      assert not_modified(_request(if_modified_since=http_date(UPDATED)), tag, UPDATED)
+      assert not not_modified(_request(if_modified_since=http_date(UPDATED - timedelta(seconds=1))), tag, UPDATED)
+      assert not not_modified(_request(if_modified_since='garbage'), tag, UPDATED)
+      # without a Last-Modified, as for lists, the date is ignored
+      assert not not_modified(_request(if_modified_since=http_date(UPDATED)), tag)
+
+def test_row_set_tag_tracks_membership_order_and_versions():
+      a, b, c = (Row(uuid.uuid4(), 1, 'CREATED') for _ in range(3))
+      tag = row_set_tag([a, b])
+      assert tag == row_set_tag([Row(a.id, 1, 'CREATED'), Row(b.id, 1, 'CREATED')])
+      assert tag != row_set_tag([b, a])
+      assert tag != row_set_tag([a, c])
+      assert tag != row_set_tag([a, Row(b.id, 2, 'CREATED')])
+      assert tag != row_set_tag([a, Row(b.id, 1, 'PUBLISHED')])
+
+def test_validator_headers():
+      assert validator_headers('W/"x"') == {'ETag': 'W/"x"', 'Cache-Control': 'no-cache'}
+      assert validator_headers('W/"x"', UPDATED)['Last-Modified'] == 'Fri, 02 Jan 2026 03:04:05 GMT'
@@ -0,0 +1,33 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from repositories.cursor import decode_cursor, encode_cursor
+
+def _raw(value) -> str:
+      return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii').rstrip('=')
+
+def test_round_trip():
+      id = uuid.uuid4()
+      assert decode_cursor(encode_cursor('Доставка, Казань', id)) == ('Доставка, Казань', id)
+
+def test_cursor_is_url_safe():
+      cursor = encode_cursor('?' * 50, uuid.uuid4())
+      assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+
+@pytest.mark.parametrize('cursor', [
+      '',
+      '!!!',
+      _raw(['x']),
+      _raw(['x', 'not-a-uuid']),
+      _raw(['x', 5]),
+      _raw([5, str(uuid.uuid4())]),
+      _raw({'name': 'x', 'id': 'y'}),
+      _raw(5),
+      base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+])
+def test_malformed_cursor_raises_value_error(cursor):
+      with pytest.raises(ValueError):
+            decode_cursor(cursor)
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from repositories import queries
+from repositories.flight import SingleFlight, flight_key
+
+def test_concurrent_calls_share_one_execution():
+      flight = SingleFlight()
+      calls = []
+
+      async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ['row']
+
+      async def main():
+            return await asyncio.gather(*(flight.do('key', fetch) for _ in range(5)))
+
+      assert asyncio.run(main()) == [['row']] * 5
+      assert len(calls) == 1
+
+def test_sequential_calls_do_not_reuse_results():
+      flight = SingleFlight()
+      results = iter([1, 2])
+
+      async def fetch():
+            return next(results)
+
+      async def main():
+            return await flight.do('key', fetch), await flight.do('key', fetch)
+
+      assert asyncio.run(main()) == (1, 2)
+
+def test_followers_share_the_leaders_exception():
+      flight = SingleFlight()
+      calls = []
+
+      async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+      async def main():
+            return await asyncio.gather(*(flight.do('key', fail) for _ in range(3)), return_exceptions=True)
+
+      results = asyncio.run(main())
+      assert all(isinstance(r, ValueError) for r in results)
+      assert len(calls) == 1
+
+def test_followers_rerun_when_the_leader_is_cancelled():
+      flight = SingleFlight()
+      calls = []
+
+      async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+      async def main():
+            leader = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                  await leader
+            return await follower
+
+      assert asyncio.run(main()) == 2
+      assert len(calls) == 2
+
+def test_cancelled_follower_leaves_the_leader_running():
+      flight = SingleFlight()
+
+      async def fetch():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+      async def main():
+            leader = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('key', fetch))
+            await asyncio.sleep(0.005)
+            follower.cancel()
+            return await leader
+
+      assert asyncio.run(main()) == 'done'
+
+def test_disabled_flight_runs_every_call():
+      flight = SingleFlight(enabled=False)
+      calls = []
+
+      async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+
+      async def main():
+            await asyncio.gather(*(flight.do('key', fetch) for _ in range(3)))
+
+      asyncio.run(main())
+      assert len(calls) == 3
+
+def test_flight_key_ignores_parameter_order_but_not_engine():
+      primary, replica = object(), object()
+      key = flight_key(queries.TENDER_LIST_BY_TYPE, {'types': ['DELIVERY'], 'limit': 5, 'offset': 0}, primary)
+      assert key == flight_key(queries.TENDER_LIST_BY_TYPE, {'offset': 0, 'limit': 5, 'types': ['DELIVERY']}, primary)
+      assert key != flight_key(queries.TENDER_LIST_BY_TYPE, {'types': ['DELIVERY'], 'limit': 5, 'offset': 0}, replica)
+      assert key != flight_key(queries.TENDER_LIST_BY_TYPE, {'types': ['DELIVERY'], 'limit': 5, 'offset': 5}, primary)
+      assert key[0] == 'tenders.list_by_type'
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from repositories.loader import BatchLoader
+
+def _recording_loader(**kwargs):
+      batches = []
+
+      async def batch_fn(keys):
+            batches.append(sorted(keys))
+            return {key: key * 10 for key in keys}
+
+      return BatchLoader(batch_fn, **kwargs), batches
+
+def test_concurrent_loads_are_batched_and_deduplicated():
+      loader, batches = _recording_loader()
+
+      async def main():
+            return await asyncio.gather(*(loader.load(k) for k in [1, 2, 2, 3]))
+
+      assert asyncio.run(main()) == [10, 20, 20, 30]
+      assert batches == [[1, 2, 3]]
+
+def test_missing_keys_resolve_to_none():
+      async def batch_fn(keys):
+            return {}
+
+      loader = BatchLoader(batch_fn)
+      assert asyncio.run(loader.load('absent')) is None
+
+def test_batches_split_at_max_batch_size():
+      loader, batches = _recording_loader(max_batch_size=2)
+
+      async def main():
+            return await asyncio.gather(*(loader.load(k) for k in range(5)))
+
+      assert asyncio.run(main()) == [0, 10, 20, 30, 40]
+      assert batches == [[0, 1], [2, 3], [4]]
+
+def test_batch_errors_reach_every_waiter():
+      async def batch_fn(keys):
+            raise RuntimeError('db down')
+
+      loader = BatchLoader(batch_fn)
+
+      async def main():
+            return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+      assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+def test_each_event_loop_gets_its_own_batch():
+      loader, batches = _recording_loader(delay=0.05)
+      ready = threading.Barrier(2)
+      results = {}
+
+      def run(name, keys):
+            async def main():
+                  ready.wait()
+                  return await asyncio.gather(*(loader.load(k) for k in keys))
+            results[name] = asyncio.run(main())
+
+      threads = [threading.Thread(target=run, args=('a', [1, 2])), threading.Thread(target=run, args=('b', [3, 4]))]
+      for thread in threads:
+            thread.start()
+      for thread in threads:
+            thread.join()
+
+      assert results == {'a': [10, 20], 'b': [30, 40]}
+      assert sorted(batches) == [[1, 2], [3, 4]]
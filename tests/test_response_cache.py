@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from cache.response import CacheBackend, MemoryBackend, ResponseCache, tender_list_tags
+
+class Source:
+      def __init__(self, value):
+            self.value = value
+            self.loads = 0
+
+      async def load(self):
+            self.loads += 1
+            await asyncio.sleep(0.01)
+            return self.value
+
+def _cache(ttl: float = 60, stale_ttl: float = 60) -> ResponseCache:
+      return ResponseCache('test', MemoryBackend(100), ttl, stale_ttl)
+
+def test_backend_interface_is_abstract():
+      with pytest.raises(TypeError):
+            CacheBackend()
+
+def test_hit_does_not_reload():
+      cache, source = _cache(), Source(1)
+
+      async def main():
+            await cache.get_or_load('k', {'t'}, source.load)
+            source.value = 2
+            return await cache.get_or_load('k', {'t'}, source.load)
+
+      assert asyncio.run(main()) == 1
+      assert source.loads == 1
+
+def test_read_after_invalidate_returns_fresh_value():
+      cache, source = _cache(), Source(1)
+
+      async def main():
+            await cache.get_or_load('k', {'t'}, source.load)
+            source.value = 2
+            await cache.invalidate({'t'})
+            return await cache.get_or_load('k', {'t'}, source.load)
+
+      assert asyncio.run(main()) == 2
+
+def test_invalidate_leaves_other_tags_cached():
+      cache, source = _cache(), Source(1)
+
+      async def main():
+            await cache.get_or_load('k', {'a'}, source.load)
+            source.value = 2
+            await cache.invalidate({'b'})
+            return await cache.get_or_load('k', {'a'}, source.load)
+
+      assert asyncio.run(main()) == 1
+
+def test_load_started_before_invalidate_is_not_stored():
+      cache, source = _cache(), Source(1)
+
+      async def main():
+            early = asyncio.ensure_future(cache.get_or_load('k', {'t'}, source.load))
+            await asyncio.sleep(0)
+            await cache.invalidate({'t'})
+            source.value = 2
+            late = await cache.get_or_load('k', {'t'}, source.load)
+            await early
+            return late, await cache.get_or_load('k', {'t'}, source.load)
+
+      assert asyncio.run(main()) == (2, 2)
+
+def test_concurrent_misses_share_one_load():
+      cache, source = _cache(), Source(1)
+
+      async def main():
+            return await asyncio.gather(*(cache.get_or_load('k', {'t'}, source.load) for _ in range(5)))
+
+      assert asyncio.run(main()) == [1] * 5
+      assert source.loads == 1
+
+def test_expired_entry_is_served_stale_while_one_refresh_runs():
+      cache, source = _cache(ttl=0), Source(1)
+
+      async def main():
+            await cache.get_or_load('k', {'t'}, source.load)
+            source.value = 2
+            stale = await asyncio.gather(*(cache.get_or_load('k', {'t'}, source.load) for _ in range(3)))
+            await asyncio.sleep(0.05)
+            return stale, await cache.get_or_load('k', {'t'}, source.load)
+
+      assert asyncio.run(main()) == ([1, 1, 1], 2)
+      assert source.loads == 3
+
+def test_disabled_cache_always_loads():
+      cache, source = ResponseCache('test', MemoryBackend(100), 60, 60, enabled=False), Source(1)
+
+      async def main():
+            await cache.get_or_load('k', {'t'}, source.load)
+            await cache.get_or_load('k', {'t'}, source.load)
+
+      asyncio.run(main())
+      assert source.loads == 2
+
+def test_memory_backend_evicts_least_recently_used():
+      cache = ResponseCache('test', MemoryBackend(2), 60, 60)
+
+      async def main():
+            for key in 'abc':
+                  await cache.get_or_load(key, {'t'}, Source(key).load)
+            return len(cache.backend), await cache.backend.get('a')
+
+      assert asyncio.run(main()) == (2, None)
+
+def test_tender_list_tags_accept_values_and_names():
+      assert tender_list_tags(['Delivery']) == tender_list_tags(['DELIVERY']) == frozenset({'tenders:DELIVERY'})
+      assert tender_list_tags(None) == frozenset({'tenders:CONSTRUCTION', 'tenders:DELIVERY', 'tenders:MANUFACTURE'})